@@ -6,7 +6,7 @@ Erweiterter Preis-Scanner mit strukturiertem HTML-Parsing,
 detaillierter Angebotsspeicherung und Deal-Erkennung.
 
 Features:
-- Strukturiertes DOM-Parsing statt Regex
+- Strukturiertes DOM-Parsing statt Regex (BeautifulSoup mit lxml-Backend)
 - Einzelne Angebote in offer_snapshot speichern
 - Aggregierte Statistiken (Quantile, Median, IQR)
 - Automatische Deal-Erkennung mit Rolling-Baseline
@@ -24,21 +24,37 @@ Cronjob (stündlich):
 
 import os
 import sys
-import json
 import time
 import logging
+import functools
 import re
+import math
+import random
 import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, List, Any, Tuple, Set
 from dataclasses import dataclass, field, asdict
-from collections import Counter
+from collections import Counter, deque
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import mysql.connector
 from mysql.connector import pooling
 from bs4 import BeautifulSoup
+import soupsieve
+
+# lxml (libxml2, C) baut den Baum deutlich schneller als html.parser;
+# ohne lxml läuft der Parser mit dem eingebauten Backend weiter
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER_BACKEND = 'lxml'
+except ImportError:
+    HTML_PARSER_BACKEND = 'html.parser'
 
 # ============================================
 # VERSION
@@ -64,6 +80,9 @@ MAX_OFFERS_PER_SCAN = int(os.getenv('MAX_OFFERS_PER_SCAN', '150'))
 SLEEP_BETWEEN_CARDS_SEC = float(os.getenv('SLEEP_BETWEEN_CARDS_SEC', '2'))
 REQUEST_TIMEOUT_SEC = int(os.getenv('REQUEST_TIMEOUT_SEC', '120'))
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+# Parallele Karten-Scans (je eine FlareSolverr-Session); höchstens 31, da der
+# MySQL-Pool eine Connection mehr braucht und mysql-connector maximal 32 erlaubt
+SCAN_CONCURRENCY = max(1, min(int(os.getenv('SCAN_CONCURRENCY', '4')), 31))
 
 # Deal Detection
 DEAL_THRESHOLD = float(os.getenv('DEAL_THRESHOLD', '0.15'))  # 15% unter Baseline
@@ -129,6 +148,56 @@ CONDITION_RANK = {
     'PO': 1, 'POOR': 1,
 }
 
+# Bekannte Condition-Schreibweisen -> Code
+_CONDITION_CODES = {
+    'MT': 'MT', 'MINT': 'MT',
+    'NM': 'NM', 'NEAR MINT': 'NM',
+    'EX': 'EX', 'EXCELLENT': 'EX',
+    'GD': 'GD', 'GOOD': 'GD',
+    'LP': 'LP', 'LIGHT PLAYED': 'LP', 'LIGHTLY PLAYED': 'LP', 'LIGHT': 'LP',
+    'PL': 'PL', 'PLAYED': 'PL',
+    'PO': 'PO', 'POOR': 'PO',
+}
+
+# Eine Alternation über alle Schreibweisen, längste zuerst ("NEAR MINT" vor "MINT")
+_CONDITION_RE = re.compile(
+    r'\b(' + '|'.join(sorted(_CONDITION_CODES, key=len, reverse=True)) + r')\b'
+)
+
+# Zeilen pro mehrzeiligem INSERT beim Offer-Insert (bleibt unter max_allowed_packet)
+OFFER_INSERT_CHUNK = 500
+
+# Obergrenze für den Retry-Backoff in fetch_with_retry (vor Jitter)
+RETRY_BACKOFF_MAX_SEC = 30
+
+# Nicht-Euro-Währungsmerkmale (Seiten-Vorprüfung im Parser)
+FOREIGN_CURRENCY_MARKERS = ('$', 'USD', '£', 'GBP')
+
+# Header für die vorkodierten FlareSolverr-Requests
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Decimal-Konstanten (einmal erzeugt statt pro Angebot/Statistik)
+_CENT = Decimal('0.01')
+_MIN_PRICE = Decimal('0.01')
+_MAX_PRICE = Decimal('10000')
+_DEAL_FACTOR = Decimal(str(1 - DEAL_THRESHOLD))  # Deal-Schwelle relativ zur Baseline
+
+# Vorkompilierte Muster für parse_price / parse_rating / parse_int
+_PRICE_RE = re.compile(r'(\d+\.?\d*)')
+_PLAIN_PRICE_RE = re.compile(r'\s*(\d+)[,.](\d{2})\s*(?:€|EUR)?\s*')  # "2,50 €" ohne Bereinigung
+_RATING_RE = re.compile(r'(\d+[.,]?\d*)')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+
+# Vorkompilierte Muster für den HTML-Parser
+_EURO_AMOUNT_RE = re.compile(r'(\d+[,\.]\d{2})\s*€')
+_SHIPPING_AMOUNT_RE = re.compile(r'\+\s*(\d+[,\.]\d{2})\s*€')
+_COUNTRY_FLAG_RE = re.compile(r'flag-icon-(\w{2})|/(\w{2})\.')
+_PRODUCT_ID_RE = re.compile(r'/Products/(\d+)')
+
+# Zeichen-Tabellen für str.translate (ein Durchlauf statt mehrerer replace)
+_PRICE_TRANS = str.maketrans({'€': None, ' ': None, ',': '.'})
+_SLUG_TRANS = str.maketrans({' ': '-', ',': None, '.': None, "'": None})
+
 # Karten-Mapping (Nummer -> Name)
 CARD_MAP = {
     'OGS': {
@@ -222,12 +291,19 @@ CARD_MAP = {
     }
 }
 
+# Geteilter leerer Fallback für unbekannte Sets (keine Allokation pro Aufruf)
+_EMPTY_MAP: Dict[str, str] = {}
+
 
 # ============================================
 # DATENKLASSEN
 # ============================================
 
-@dataclass
+# __slots__ statt __dict__ pro Instanz (dataclass-Option ab Python 3.10)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Offer:
     """Repräsentiert ein einzelnes Angebot."""
     position: int
@@ -257,7 +333,7 @@ class Offer:
                 self.total = self.price_item
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ScanResult:
     """Ergebnis eines einzelnen Scans."""
     success: bool
@@ -269,7 +345,7 @@ class ScanResult:
     product_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AggregatedStats:
     """Aggregierte Statistiken für einen Scan."""
     offer_count: int = 0
@@ -294,29 +370,40 @@ class AggregatedStats:
 
 def get_card_name(card_number: str, set_code: str) -> Optional[str]:
     """Ermittelt den Kartennamen aus der Nummer."""
-    set_map = CARD_MAP.get(set_code, {})
+    set_map = CARD_MAP.get(set_code, _EMPTY_MAP)
 
-    if card_number in set_map:
-        return set_map[card_number]
+    name = set_map.get(card_number)
+    if name is not None:
+        return name
 
+    # Führende Nullen ("001") nur bei Fehltreffer entfernen; "000" bleibt "0"
     stripped = card_number.lstrip('0')
-    if stripped in set_map:
-        return set_map[stripped]
+    if not stripped and card_number:
+        stripped = '0'
+    return set_map.get(stripped)
 
-    return None
+
+def _card_slug(card_name: str) -> str:
+    """Wandelt einen Kartennamen in den URL-Slug von Cardmarket um."""
+    return (card_name
+            .replace(' - ', '-')
+            .translate(_SLUG_TRANS)
+            .replace('--', '-'))
+
+
+# Slugs aller bekannten Karten einmal beim Import erzeugen
+_CARD_SLUGS = {
+    name: _card_slug(name)
+    for set_map in CARD_MAP.values()
+    for name in set_map.values()
+}
 
 
 def generate_cardmarket_url(set_code: str, card_name: str, country_code: str = None, is_foil: bool = False) -> str:
     """Generiert die Cardmarket-URL für eine Karte mit Länderfilter."""
     set_url_name = SET_URL_MAP.get(set_code, 'Origins')
 
-    slug = (card_name
-            .replace(' - ', '-')
-            .replace(' ', '-')
-            .replace(',', '')
-            .replace('.', '')
-            .replace("'", '')
-            .replace('--', '-'))
+    slug = _CARD_SLUGS.get(card_name) or _card_slug(card_name)
 
     url = f"{CARDMARKET_BASE_URL}/{set_url_name}/{slug}"
 
@@ -337,17 +424,21 @@ def parse_price(price_str: str) -> Optional[Decimal]:
     if not price_str:
         return None
 
+    # Schneller Pfad für das übliche Format, Ergebnis identisch zum Bereinigungspfad
+    match = _PLAIN_PRICE_RE.fullmatch(price_str)
+    if match:
+        euros, cents = match.groups()
+        return Decimal(f'{euros}.{cents}')
+
     try:
         cleaned = (price_str
-                   .replace('€', '')
                    .replace('EUR', '')
-                   .replace(' ', '')
-                   .replace(',', '.')
+                   .translate(_PRICE_TRANS)
                    .strip())
 
-        match = re.search(r'(\d+\.?\d*)', cleaned)
+        match = _PRICE_RE.search(cleaned)
         if match:
-            return Decimal(match.group(1)).quantize(Decimal('0.01'))
+            return Decimal(match.group(1)).quantize(_CENT)
     except (InvalidOperation, ValueError):
         pass
 
@@ -360,7 +451,7 @@ def parse_rating(rating_str: str) -> Optional[float]:
         return None
 
     try:
-        match = re.search(r'(\d+[.,]?\d*)', rating_str.replace(',', '.'))
+        match = _RATING_RE.search(rating_str.replace(',', '.'))
         if match:
             return float(match.group(1))
     except ValueError:
@@ -375,37 +466,26 @@ def parse_int(value_str: str) -> Optional[int]:
         return None
 
     try:
-        cleaned = re.sub(r'[^\d]', '', value_str)
+        cleaned = _NON_DIGIT_RE.sub('', value_str)
         return int(cleaned) if cleaned else None
     except ValueError:
         return None
 
 
+@functools.lru_cache(maxsize=64)
 def normalize_condition(condition: str) -> Optional[str]:
-    """Normalisiert Condition-Strings."""
+    """Normalisiert Condition-Strings (gecacht, nur ~10 verschiedene Eingaben)."""
     if not condition:
         return None
 
-    upper = condition.upper().strip()
-
-    # Direkte Matches
-    for code in ['MT', 'NM', 'EX', 'GD', 'LP', 'PL', 'PO']:
-        if code in upper:
-            return code
+    match = _CONDITION_RE.search(condition.upper())
+    if match:
+        return _CONDITION_CODES[match.group(1)]
 
-    # Vollständige Namen
-    mapping = {
-        'MINT': 'MT', 'NEAR MINT': 'NM', 'EXCELLENT': 'EX',
-        'GOOD': 'GD', 'LIGHT': 'LP', 'PLAYED': 'PL', 'POOR': 'PO'
-    }
-
-    for key, val in mapping.items():
-        if key in upper:
-            return val
-
-    return condition[:32] if condition else None
+    return condition[:32]
 
 
+@functools.lru_cache(maxsize=64)
 def condition_meets_minimum(condition: Optional[str], min_condition: str) -> bool:
     """Prüft ob ein Zustand das Minimum erfüllt."""
     if not condition:
@@ -417,26 +497,40 @@ def condition_meets_minimum(condition: Optional[str], min_condition: str) -> boo
     return cond_rank >= min_rank
 
 
+def _to_cents(value: float) -> Decimal:
+    """Rundet einen Float auf Cent (ein Decimal aus fertigem String, kein quantize)."""
+    return Decimal(f'{value:.2f}')
+
+
 def calculate_percentile(sorted_values: List[float], percentile: float) -> Optional[Decimal]:
     """Berechnet ein Perzentil aus sortierten Werten."""
     if not sorted_values:
         return None
+    return calculate_percentiles(sorted_values, (percentile,))[0]
+
+
+def calculate_percentiles(sorted_values: List[float], percentiles) -> List[Optional[Decimal]]:
+    """Berechnet mehrere Perzentile in einem Durchgang aus sortierten Werten."""
+    if not sorted_values:
+        return [None] * len(percentiles)
 
     n = len(sorted_values)
-    if n == 1:
-        return Decimal(str(sorted_values[0])).quantize(Decimal('0.01'))
+    last = n - 1
+    results = []
 
-    k = (n - 1) * (percentile / 100.0)
-    f = int(k)
-    c = f + 1
+    for percentile in percentiles:
+        k = last * (percentile / 100.0)
+        f = int(k)
+        c = f + 1
 
-    if c >= n:
-        return Decimal(str(sorted_values[-1])).quantize(Decimal('0.01'))
+        if c >= n:
+            value = sorted_values[-1]
+        else:
+            value = sorted_values[f] * (c - k) + sorted_values[c] * (k - f)
 
-    d0 = sorted_values[f] * (c - k)
-    d1 = sorted_values[c] * (k - f)
+        results.append(_to_cents(value))
 
-    return Decimal(str(d0 + d1)).quantize(Decimal('0.01'))
+    return results
 
 
 def calculate_trimmed_mean(values: List[float], trim_pct: float = 0.1) -> Optional[Decimal]:
@@ -444,21 +538,36 @@ def calculate_trimmed_mean(values: List[float], trim_pct: float = 0.1) -> Option
     if not values:
         return None
 
-    n = len(values)
+    return _trimmed_mean_sorted(sorted(values), trim_pct)
+
+
+def _trimmed_mean_sorted(sorted_vals: List[float], trim_pct: float = 0.1) -> Optional[Decimal]:
+    """Getrimmter Mittelwert aus bereits sortierten Werten (ohne erneutes Sortieren)."""
+    if not sorted_vals:
+        return None
+
+    n = len(sorted_vals)
     if n < 3:
-        return Decimal(str(statistics.mean(values))).quantize(Decimal('0.01'))
+        return _to_cents(math.fsum(sorted_vals) / n)
 
     trim_count = int(n * trim_pct)
     if trim_count == 0:
         trim_count = 1 if n > 2 else 0
 
-    sorted_vals = sorted(values)
     trimmed = sorted_vals[trim_count:n - trim_count] if trim_count > 0 else sorted_vals
 
     if not trimmed:
         trimmed = sorted_vals
 
-    return Decimal(str(statistics.mean(trimmed))).quantize(Decimal('0.01'))
+    return _to_cents(math.fsum(trimmed) / len(trimmed))
+
+
+def path_segment_after(url: str, marker: str) -> Optional[str]:
+    """Liefert das Pfadsegment direkt nach marker (str.find statt Regex)."""
+    idx = url.find(marker)
+    if idx < 0:
+        return None
+    return url[idx + len(marker):].split('/', 1)[0] or None
 
 
 def utc_now() -> datetime:
@@ -470,21 +579,133 @@ def utc_now() -> datetime:
 # HTML PARSER
 # ============================================
 
+def _compile_selectors(*selectors: str) -> Tuple:
+    """Kompiliert CSS-Selektoren einmalig mit soupsieve."""
+    return tuple(soupsieve.compile(selector) for selector in selectors)
+
+
 class CardmarketParser:
     """Parser für Cardmarket HTML-Seiten."""
 
-    # CSS-Selektoren für Angebote (mit Fallbacks)
-    OFFER_SELECTORS = [
+    # CSS-Selektoren (mit Fallbacks), einmal beim Import kompiliert
+    OFFER_SELECTORS = _compile_selectors(
         'div.article-row',
         'div[class*="article"]',
         'tr.article',
         'div.row.no-gutters.article',
         '.table-body .row',
-    ]
+    )
+
+    PRICE_SELECTORS = _compile_selectors(
+        '.price-container .font-weight-bold',
+        '.price-container span',
+        '[class*="price"] .font-weight-bold',
+        'span.font-weight-bold',
+        '.color-primary',
+        '[data-original-title*="price"]',
+    )
+
+    SHIPPING_SELECTORS = _compile_selectors(
+        '.shipping-price',
+        '[class*="shipping"]',
+        'span[title*="Versand"]',
+        'span[title*="shipping"]',
+    )
+
+    QUANTITY_SELECTORS = _compile_selectors(
+        '.amount-container span',
+        '[class*="quantity"]',
+        '[class*="amount"]',
+        'input[name="amount"]',
+    )
+
+    CONDITION_SELECTORS = _compile_selectors(
+        'a[data-original-title]',
+        'span[data-original-title]',
+        '.product-attributes span',
+        '[class*="condition"]',
+    )
+
+    LANGUAGE_SELECTORS = _compile_selectors(
+        'span[data-original-title*="Language"]',
+        'span[class*="flag"]',
+        'img[src*="flag"]',
+        '[class*="language"]',
+    )
+
+    SELLER_SELECTORS = _compile_selectors(
+        'a[href*="/Users/"]',
+        '.seller-name a',
+        '[class*="seller"] a',
+    )
+
+    RATING_SELECTORS = _compile_selectors(
+        'span[class*="seller-rating"]',
+        '[class*="rating"]',
+        'span[title*="%"]',
+    )
+
+    SALES_SELECTORS = _compile_selectors(
+        '[class*="sell-count"]',
+        'span[title*="sales"]',
+        'span[title*="Verkäufe"]',
+    )
+
+    COUNTRY_SELECTORS = _compile_selectors(
+        'span[class*="flag-icon"]',
+        'img[src*="flag"]',
+        '[data-original-title*="Country"]',
+    )
+
+    ARTICLE_LINK_SELECTORS = _compile_selectors(
+        'a[href*="/Article/"]',
+        'a[href*="/article/"]',
+        'a.article-link',
+    )
+
+    FOIL_SELECTOR = soupsieve.compile('[class*="foil"], [data-original-title*="Foil"]')
+
+    # Verkäufer-Flags: (Flag, Teilstring in class, Teilstring in title)
+    SELLER_FLAGS = (
+        ('professional', 'professional', 'Professional'),
+        ('powerseller', 'powerseller', 'Powerseller'),
+        ('onVacation', 'vacation', 'Vacation'),
+    )
+
+    # Zustands-Schreibweisen als eine Alternation (ohne .lower()-Kopien)
+    CONDITION_RE = re.compile(_CONDITION_RE.pattern, re.IGNORECASE)
+
+    # Sprach-Schlüssel (ausgeschriebene Namen und Zwei-Buchstaben-Codes)
+    LANGUAGE_MAP = {
+        'german': 'German', 'deutsch': 'German', 'de': 'German',
+        'english': 'English', 'englisch': 'English', 'en': 'English',
+        'french': 'French', 'französisch': 'French', 'fr': 'French',
+        'spanish': 'Spanish', 'spanisch': 'Spanish', 'es': 'Spanish',
+        'italian': 'Italian', 'italienisch': 'Italian', 'it': 'Italian',
+        'japanese': 'Japanese', 'japanisch': 'Japanese', 'jp': 'Japanese',
+        'chinese': 'Chinese', 'chinesisch': 'Chinese',
+        'korean': 'Korean', 'koreanisch': 'Korean',
+        'portuguese': 'Portuguese', 'portugiesisch': 'Portuguese',
+    }
+
+    # Namen nur als ganze Wörter ("french" enthält sonst "en" -> English)
+    LANGUAGE_RE = re.compile(
+        r'\b(' + '|'.join(sorted((k for k in LANGUAGE_MAP if len(k) > 2), key=len, reverse=True)) + r')\b',
+        re.IGNORECASE
+    )
+
+    # Sprach-Code aus Flaggen-Bildern (".../de.png")
+    LANGUAGE_CODE_RE = re.compile(r'/([a-z]{2})\.(?:png|svg|gif|jpe?g|webp)\b', re.IGNORECASE)
+
+    FOIL_INDICATORS = ('foil', 'holo', 'holographic')
 
     def __init__(self, html: str):
-        self.soup = BeautifulSoup(html, 'html.parser')
+        self.soup = BeautifulSoup(html, HTML_PARSER_BACKEND)
         self.offers: List[Offer] = []
+        # Ohne $/USD/£/GBP irgendwo im Seitentext ist jede Zeile EUR
+        # (get_text() löst Entities wie &#36; oder &pound; auf, wie im Zeilentext)
+        page_text = self.soup.get_text()
+        self._foreign_currency = any(marker in page_text for marker in FOREIGN_CURRENCY_MARKERS)
 
     def parse(self, max_offers: int = MAX_OFFERS_PER_SCAN) -> List[Offer]:
         """Parst alle Angebote aus dem HTML."""
@@ -499,7 +720,7 @@ class CardmarketParser:
                 if offer and offer.price_item is not None:
                     self.offers.append(offer)
             except Exception as e:
-                logger.debug(f"Fehler beim Parsen von Angebot {idx}: {e}")
+                logger.debug("Fehler beim Parsen von Angebot %d: %s", idx, e)
                 continue
 
         return self.offers
@@ -507,18 +728,22 @@ class CardmarketParser:
     def _find_offer_elements(self) -> List:
         """Findet alle Angebots-Elemente mit Fallbacks."""
         for selector in self.OFFER_SELECTORS:
-            elements = self.soup.select(selector)
+            elements = selector.select(self.soup)
             if elements:
-                logger.debug(f"Gefunden {len(elements)} Elemente mit Selektor: {selector}")
+                logger.debug("Gefunden %d Elemente mit Selektor: %s", len(elements), selector.pattern)
                 return elements
 
         # Fallback: Suche nach Preis-Patterns und navigiere zum Container
-        price_elements = self.soup.find_all(string=re.compile(r'\d+[,\.]\d{2}\s*€'))
+        price_elements = self.soup.find_all(string=_EURO_AMOUNT_RE)
         if price_elements:
+            # Deduplizieren über die Objekt-Identität: "in list" vergleicht
+            # Tags strukturell (teuer, O(n²)) und verschmilzt gleiche Zeilen
             containers = []
+            seen = set()
             for el in price_elements:
                 parent = el.find_parent(['div', 'tr'])
-                if parent and parent not in containers:
+                if parent is not None and id(parent) not in seen:
+                    seen.add(id(parent))
                     containers.append(parent)
             return containers
 
@@ -526,37 +751,38 @@ class CardmarketParser:
 
     def _parse_offer_element(self, element, position: int) -> Optional[Offer]:
         """Parst ein einzelnes Angebots-Element."""
-        offer = Offer(position=position, price_item=Decimal('0'))
+        # Zeilentext nur einmal serialisieren; alle Fallbacks teilen ihn
+        text = element.get_text()
+        text_lower = text.lower()
 
         # === PREIS ===
-        price_item = self._extract_price(element)
+        # Zeilen ohne gültigen Preis verwerfen, bevor ein Offer entsteht
+        price_item = self._extract_price(element, text)
         if price_item is None:
             return None
-        offer.price_item = price_item
-
-        # === VERSAND ===
-        offer.shipping = self._extract_shipping(element)
 
-        # === TOTAL ===
-        if offer.shipping is not None:
-            offer.total = offer.price_item + offer.shipping
-        else:
-            offer.total = offer.price_item
+        # === VERSAND / TOTAL ===
+        # total berechnet Offer.__post_init__ genau einmal
+        offer = Offer(
+            position=position,
+            price_item=price_item,
+            shipping=self._extract_shipping(element, text)
+        )
 
         # === WÄHRUNG ===
-        offer.currency = self._extract_currency(element)
+        offer.currency = self._extract_currency(element, text)
 
         # === MENGE ===
         offer.quantity = self._extract_quantity(element)
 
         # === ZUSTAND ===
-        offer.condition = self._extract_condition(element)
+        offer.condition = self._extract_condition(element, text)
 
         # === SPRACHE ===
         offer.language = self._extract_language(element)
 
         # === FOIL ===
-        offer.is_foil = self._extract_foil(element)
+        offer.is_foil = self._extract_foil(element, text_lower)
 
         # === VERKÄUFER ===
         seller_info = self._extract_seller_info(element)
@@ -570,64 +796,53 @@ class CardmarketParser:
         offer.article_url, offer.article_id = self._extract_article_info(element)
 
         # === FLAGS ===
-        offer.flags = self._extract_flags(element)
+        offer.flags = self._extract_flags(element, text_lower)
 
         return offer
 
-    def _extract_price(self, element) -> Optional[Decimal]:
+    def _extract_price(self, element, text: Optional[str] = None) -> Optional[Decimal]:
         """Extrahiert den Artikelpreis."""
-        # Verschiedene Selektoren für Preise
-        price_selectors = [
-            '.price-container .font-weight-bold',
-            '.price-container span',
-            '[class*="price"] .font-weight-bold',
-            'span.font-weight-bold',
-            '.color-primary',
-            '[data-original-title*="price"]',
-        ]
-
-        for selector in price_selectors:
-            price_el = element.select_one(selector)
+        for selector in self.PRICE_SELECTORS:
+            price_el = selector.select_one(element)
             if price_el:
                 price = parse_price(price_el.get_text())
-                if price and Decimal('0.01') <= price <= Decimal('10000'):
+                if price and _MIN_PRICE <= price <= _MAX_PRICE:
                     return price
 
         # Fallback: Regex im gesamten Element
-        text = element.get_text()
-        matches = re.findall(r'(\d+[,\.]\d{2})\s*€', text)
-        if matches:
-            price = parse_price(matches[0])
-            if price and Decimal('0.01') <= price <= Decimal('10000'):
+        if text is None:
+            text = element.get_text()
+        match = _EURO_AMOUNT_RE.search(text)
+        if match:
+            price = parse_price(match.group(1))
+            if price and _MIN_PRICE <= price <= _MAX_PRICE:
                 return price
 
         return None
 
-    def _extract_shipping(self, element) -> Optional[Decimal]:
+    def _extract_shipping(self, element, text: Optional[str] = None) -> Optional[Decimal]:
         """Extrahiert die Versandkosten."""
-        shipping_selectors = [
-            '.shipping-price',
-            '[class*="shipping"]',
-            'span[title*="Versand"]',
-            'span[title*="shipping"]',
-        ]
-
-        for selector in shipping_selectors:
-            ship_el = element.select_one(selector)
+        for selector in self.SHIPPING_SELECTORS:
+            ship_el = selector.select_one(element)
             if ship_el:
                 return parse_price(ship_el.get_text())
 
         # Suche nach "+" Versand-Pattern
-        text = element.get_text()
-        ship_match = re.search(r'\+\s*(\d+[,\.]\d{2})\s*€', text)
+        if text is None:
+            text = element.get_text()
+        ship_match = _SHIPPING_AMOUNT_RE.search(text)
         if ship_match:
             return parse_price(ship_match.group(1))
 
         return None
 
-    def _extract_currency(self, element) -> str:
+    def _extract_currency(self, element, text: Optional[str] = None) -> str:
         """Extrahiert die Währung."""
-        text = element.get_text()
+        if not self._foreign_currency:
+            return 'EUR'
+
+        if text is None:
+            text = element.get_text()
         if '€' in text or 'EUR' in text:
             return 'EUR'
         if '$' in text or 'USD' in text:
@@ -638,15 +853,8 @@ class CardmarketParser:
 
     def _extract_quantity(self, element) -> Optional[int]:
         """Extrahiert die verfügbare Menge."""
-        qty_selectors = [
-            '.amount-container span',
-            '[class*="quantity"]',
-            '[class*="amount"]',
-            'input[name="amount"]',
-        ]
-
-        for selector in qty_selectors:
-            qty_el = element.select_one(selector)
+        for selector in self.QUANTITY_SELECTORS:
+            qty_el = selector.select_one(element)
             if qty_el:
                 val = qty_el.get('value') or qty_el.get_text()
                 qty = parse_int(val)
@@ -655,86 +863,70 @@ class CardmarketParser:
 
         return None
 
-    def _extract_condition(self, element) -> Optional[str]:
+    def _extract_condition(self, element, text: Optional[str] = None) -> Optional[str]:
         """Extrahiert den Kartenzustand."""
-        cond_selectors = [
-            'a[data-original-title]',
-            'span[data-original-title]',
-            '.product-attributes span',
-            '[class*="condition"]',
-        ]
-
-        conditions = ['Mint', 'Near Mint', 'NM', 'Excellent', 'EX',
-                      'Good', 'GD', 'Light Played', 'LP', 'Played', 'PL', 'Poor', 'PO']
-
-        for selector in cond_selectors:
-            for el in element.select(selector):
+        for selector in self.CONDITION_SELECTORS:
+            for el in selector.select(element):
                 title = el.get('data-original-title', '') or el.get('title', '')
-                text = el.get_text()
-
-                for cond in conditions:
-                    if cond.lower() in title.lower() or cond.lower() in text.lower():
-                        return normalize_condition(cond)
-
-        # Fallback: Regex im Text
-        text = element.get_text()
-        for cond in conditions:
-            if cond.lower() in text.lower():
-                return normalize_condition(cond)
+                match = self.CONDITION_RE.search(title) or self.CONDITION_RE.search(el.get_text())
+                if match:
+                    return _CONDITION_CODES[match.group(1).upper()]
+
+        # Fallback: Suche im Text
+        if text is None:
+            text = element.get_text()
+        match = self.CONDITION_RE.search(text)
+        if match:
+            return _CONDITION_CODES[match.group(1).upper()]
 
         return None
 
     def _extract_language(self, element) -> Optional[str]:
         """Extrahiert die Kartensprache."""
-        lang_map = {
-            'german': 'German', 'deutsch': 'German', 'de': 'German',
-            'english': 'English', 'englisch': 'English', 'en': 'English',
-            'french': 'French', 'französisch': 'French', 'fr': 'French',
-            'spanish': 'Spanish', 'spanisch': 'Spanish', 'es': 'Spanish',
-            'italian': 'Italian', 'italienisch': 'Italian', 'it': 'Italian',
-            'japanese': 'Japanese', 'japanisch': 'Japanese', 'jp': 'Japanese',
-            'chinese': 'Chinese', 'chinesisch': 'Chinese',
-            'korean': 'Korean', 'koreanisch': 'Korean',
-            'portuguese': 'Portuguese', 'portugiesisch': 'Portuguese',
-        }
-
         # Suche nach Flaggen-Icons oder Sprach-Tags
-        lang_selectors = [
-            'span[data-original-title*="Language"]',
-            'span[class*="flag"]',
-            'img[src*="flag"]',
-            '[class*="language"]',
-        ]
-
-        for selector in lang_selectors:
-            lang_el = element.select_one(selector)
+        for selector in self.LANGUAGE_SELECTORS:
+            lang_el = selector.select_one(element)
             if lang_el:
                 title = lang_el.get('data-original-title', '') or lang_el.get('title', '')
                 src = lang_el.get('src', '')
 
-                check_str = (title + src).lower()
-                for key, val in lang_map.items():
-                    if key in check_str:
-                        return val
+                match = self.LANGUAGE_RE.search(title) or self.LANGUAGE_RE.search(src)
+                if match:
+                    return self.LANGUAGE_MAP[match.group(1).lower()]
+
+                # Reiner Code im Titel, sonst Code aus dem Bildnamen
+                code = title.strip().lower()
+                if code in self.LANGUAGE_MAP:
+                    return self.LANGUAGE_MAP[code]
+
+                code_match = self.LANGUAGE_CODE_RE.search(src)
+                if code_match and code_match.group(1).lower() in self.LANGUAGE_MAP:
+                    return self.LANGUAGE_MAP[code_match.group(1).lower()]
 
         return None
 
-    def _extract_foil(self, element) -> bool:
+    def _extract_foil(self, element, text_lower: Optional[str] = None) -> bool:
         """Prüft ob es sich um eine Foil-Karte handelt."""
-        foil_indicators = ['foil', 'holo', 'holographic']
-
-        classes = ' '.join(element.get('class', []))
-        text = element.get_text().lower()
+        # Günstigste Prüfung zuerst: Klassen der Zeile selbst
+        for cls in element.get('class') or ():
+            cls = cls.lower()
+            if any(indicator in cls for indicator in self.FOIL_INDICATORS):
+                return True
 
-        for indicator in foil_indicators:
-            if indicator in classes.lower() or indicator in text:
+        # Bereits vorhandener Zeilentext kostet nur drei Teilstring-Suchen
+        if text_lower is not None:
+            if any(indicator in text_lower for indicator in self.FOIL_INDICATORS):
                 return True
 
         # Suche nach Foil-Icon
-        foil_el = element.select_one('[class*="foil"], [data-original-title*="Foil"]')
-        if foil_el:
+        if self.FOIL_SELECTOR.select_one(element):
             return True
 
+        # Ohne übergebenen Text erst jetzt den Teilbaum serialisieren
+        if text_lower is None:
+            text_lower = element.get_text().lower()
+            return any(indicator in text_lower for indicator in self.FOIL_INDICATORS)
+
         return False
 
     def _extract_seller_info(self, element) -> Dict[str, Any]:
@@ -742,33 +934,21 @@ class CardmarketParser:
         info = {}
 
         # Verkäufername
-        seller_selectors = [
-            'a[href*="/Users/"]',
-            '.seller-name a',
-            '[class*="seller"] a',
-        ]
-
-        for selector in seller_selectors:
-            seller_el = element.select_one(selector)
+        for selector in self.SELLER_SELECTORS:
+            seller_el = selector.select_one(element)
             if seller_el:
                 info['name'] = seller_el.get_text().strip()
                 href = seller_el.get('href', '')
 
                 # ID aus URL extrahieren
-                id_match = re.search(r'/Users/([^/]+)', href)
-                if id_match:
-                    info['id'] = id_match.group(1)
+                seller_id = path_segment_after(href, '/Users/')
+                if seller_id:
+                    info['id'] = seller_id
                 break
 
         # Rating
-        rating_selectors = [
-            'span[class*="seller-rating"]',
-            '[class*="rating"]',
-            'span[title*="%"]',
-        ]
-
-        for selector in rating_selectors:
-            rating_el = element.select_one(selector)
+        for selector in self.RATING_SELECTORS:
+            rating_el = selector.select_one(element)
             if rating_el:
                 rating_text = rating_el.get('title', '') or rating_el.get_text()
                 rating = parse_rating(rating_text)
@@ -777,14 +957,8 @@ class CardmarketParser:
                     break
 
         # Verkäufe
-        sales_selectors = [
-            '[class*="sell-count"]',
-            'span[title*="sales"]',
-            'span[title*="Verkäufe"]',
-        ]
-
-        for selector in sales_selectors:
-            sales_el = element.select_one(selector)
+        for selector in self.SALES_SELECTORS:
+            sales_el = selector.select_one(element)
             if sales_el:
                 sales = parse_int(sales_el.get_text())
                 if sales:
@@ -792,21 +966,15 @@ class CardmarketParser:
                     break
 
         # Land
-        country_selectors = [
-            'span[class*="flag-icon"]',
-            'img[src*="flag"]',
-            '[data-original-title*="Country"]',
-        ]
-
-        for selector in country_selectors:
-            country_el = element.select_one(selector)
+        for selector in self.COUNTRY_SELECTORS:
+            country_el = selector.select_one(element)
             if country_el:
                 classes = ' '.join(country_el.get('class', []))
                 title = country_el.get('data-original-title', '')
                 src = country_el.get('src', '')
 
                 # Country-Code aus Klasse oder URL extrahieren
-                country_match = re.search(r'flag-icon-(\w{2})|/(\w{2})\.', classes + src)
+                country_match = _COUNTRY_FLAG_RE.search(classes + src)
                 if country_match:
                     info['country'] = (country_match.group(1) or country_match.group(2)).upper()
                     break
@@ -819,14 +987,8 @@ class CardmarketParser:
         article_id = None
 
         # Suche nach direktem Artikel-Link
-        link_selectors = [
-            'a[href*="/Article/"]',
-            'a[href*="/article/"]',
-            'a.article-link',
-        ]
-
-        for selector in link_selectors:
-            link_el = element.select_one(selector)
+        for selector in self.ARTICLE_LINK_SELECTORS:
+            link_el = selector.select_one(element)
             if link_el:
                 href = link_el.get('href', '')
                 if href:
@@ -834,10 +996,13 @@ class CardmarketParser:
                         href = 'https://www.cardmarket.com' + href
                     article_url = href
 
-                    # ID aus URL
-                    id_match = re.search(r'/Article/(\d+)', href, re.I)
-                    if id_match:
-                        article_id = id_match.group(1)
+                    # ID aus URL (führende Ziffern nach /Article/, Groß-/Kleinschreibung egal)
+                    segment = path_segment_after(href.lower(), '/article/')
+                    if segment:
+                        end = 0
+                        while end < len(segment) and segment[end].isdigit():
+                            end += 1
+                        article_id = segment[:end] or None
                     break
 
         # Alternative: data-Attribute
@@ -846,24 +1011,25 @@ class CardmarketParser:
 
         return article_url, article_id
 
-    def _extract_flags(self, element) -> Dict[str, Any]:
+    def _extract_flags(self, element, text_lower: Optional[str] = None) -> Dict[str, Any]:
         """Extrahiert zusätzliche Flags."""
         flags = {}
 
-        # Professional Seller
-        if element.select_one('[class*="professional"], [title*="Professional"]'):
-            flags['professional'] = True
-
-        # Powerseller
-        if element.select_one('[class*="powerseller"], [title*="Powerseller"]'):
-            flags['powerseller'] = True
-
-        # On Vacation
-        if element.select_one('[class*="vacation"], [title*="Vacation"]'):
-            flags['onVacation'] = True
+        # Professional / Powerseller / On Vacation: ein Durchlauf über die
+        # Nachfahren statt einer eigenen Selektor-Suche je Flag
+        for el in element.find_all(True):
+            classes = ' '.join(el.get('class', ()))
+            title = el.get('title', '')
+            for flag, class_part, title_part in self.SELLER_FLAGS:
+                if class_part in classes or title_part in title:
+                    flags[flag] = True
+            if len(flags) == len(self.SELLER_FLAGS):
+                break
 
         # First Edition, etc.
-        if 'first edition' in element.get_text().lower():
+        if text_lower is None:
+            text_lower = element.get_text().lower()
+        if 'first edition' in text_lower:
             flags['firstEdition'] = True
 
         return flags if flags else {}
@@ -874,7 +1040,7 @@ class CardmarketParser:
         meta = self.soup.find('meta', {'property': 'og:url'})
         if meta:
             content = meta.get('content', '')
-            match = re.search(r'/Products/(\d+)', content)
+            match = _PRODUCT_ID_RE.search(content)
             if match:
                 return match.group(1)
 
@@ -882,12 +1048,18 @@ class CardmarketParser:
         canonical = self.soup.find('link', {'rel': 'canonical'})
         if canonical:
             href = canonical.get('href', '')
-            match = re.search(r'/Products/(\d+)', href)
+            match = _PRODUCT_ID_RE.search(href)
             if match:
                 return match.group(1)
 
         return None
 
+    def close(self):
+        """Gibt den Dokumentbaum frei (Offers halten nur einfache Strings)."""
+        if self.soup is not None:
+            self.soup.decompose()
+            self.soup = None
+
 
 # ============================================
 # AGGREGATION
@@ -921,40 +1093,63 @@ def calculate_aggregates(offers: List[Offer]) -> AggregatedStats:
     if not prices:
         return stats
 
+    # Einmal sortieren; Perzentile, Min/Max und getrimmter Mittelwert
+    # arbeiten alle auf derselben sortierten Liste
     sorted_prices = sorted(prices)
 
-    # Basis-Statistiken
-    stats.min_total = Decimal(str(sorted_prices[0])).quantize(Decimal('0.01'))
-    stats.max_total = Decimal(str(sorted_prices[-1])).quantize(Decimal('0.01'))
-    stats.mean_total = Decimal(str(statistics.mean(prices))).quantize(Decimal('0.01'))
+    # Basis-Statistiken (fsum: exakt gerundete Summe ohne Fraction-Umweg)
+    n = len(prices)
+    mean = math.fsum(prices) / n
+    stats.min_total = _to_cents(sorted_prices[0])
+    stats.max_total = _to_cents(sorted_prices[-1])
+    stats.mean_total = _to_cents(mean)
 
     # Perzentile
-    stats.p10_total = calculate_percentile(sorted_prices, 10)
-    stats.p25_total = calculate_percentile(sorted_prices, 25)
-    stats.median_total = calculate_percentile(sorted_prices, 50)
-    stats.p75_total = calculate_percentile(sorted_prices, 75)
-    stats.p90_total = calculate_percentile(sorted_prices, 90)
+    (stats.p10_total, stats.p25_total, stats.median_total,
+     stats.p75_total, stats.p90_total) = calculate_percentiles(sorted_prices, (10, 25, 50, 75, 90))
 
     # IQR
     if stats.p25_total and stats.p75_total:
         stats.iqr_total = stats.p75_total - stats.p25_total
 
     # Standardabweichung
-    if len(prices) > 1:
-        stats.stdev_total = Decimal(str(statistics.stdev(prices))).quantize(Decimal('0.01'))
+    if n > 1:
+        variance = math.fsum((p - mean) ** 2 for p in prices) / (n - 1)
+        stats.stdev_total = _to_cents(math.sqrt(variance))
 
     # Getrimmter Mittelwert
-    stats.trimmed_mean_total = calculate_trimmed_mean(prices)
+    stats.trimmed_mean_total = _trimmed_mean_sorted(sorted_prices)
 
-    # Modus (häufigster Preis)
-    try:
-        stats.mode_total = Decimal(str(statistics.mode(prices))).quantize(Decimal('0.01'))
-    except statistics.StatisticsError:
-        pass
+    # Modus (häufigster Preis; bei Gleichstand der zuerst gesehene wie statistics.mode)
+    stats.mode_total = _to_cents(Counter(prices).most_common(1)[0][0])
 
     return stats
 
 
+# ============================================
+# RATE LIMITING
+# ============================================
+
+class TokenBucket:
+    """Thread-sicherer Rate-Limiter: höchstens ein Token pro Intervall."""
+
+    def __init__(self, interval_sec: float = SLEEP_BETWEEN_CARDS_SEC):
+        self.interval_sec = interval_sec
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        """Blockiert bis das nächste Token verfügbar ist."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval_sec
+
+        wait_time = slot - now
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
 # ============================================
 # FLARESOLVERR
 # ============================================
@@ -966,41 +1161,127 @@ class FlareSolverrClient:
         self.base_url = base_url
         self.session_id = session_id
         self.session_active = False
-
-    def create_session(self) -> bool:
-        """Erstellt eine neue Session."""
+        self._local = threading.local()
+        # Eine FlareSolverr-Session (= eine Browser-Instanz) je Worker-Thread,
+        # damit parallele Navigationen sich nicht gegenseitig die Seite tauschen
+        self._sessions_lock = threading.Lock()
+        # _sessions: alle vergebenen Namen (für destroy_session),
+        # _open_sessions: davon erfolgreich erstellt
+        self._sessions: List[str] = []
+        self._open_sessions: Set[str] = set()
+        self._free_sessions: List[str] = []
+        self._session_counter = 0
+
+    def _http(self) -> requests.Session:
+        """Liefert die HTTP-Session des aktuellen Threads (Keep-Alive)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            # Ein Worker spricht nur mit FlareSolverr: eine Keep-Alive-Verbindung
+            # genügt, Wiederholungen übernimmt fetch_with_retry
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def _post(self, payload: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """
+        Sendet ein Kommando an FlareSolverr (orjson-kodierter Body) und
+        liefert die dekodierte Antwort. Die Response wird sofort geschlossen,
+        damit die Keep-Alive-Verbindung zurück in den Pool geht.
+        """
+        with self._http().post(
+            self.base_url,
+            data=orjson.dumps(payload),
+            headers=_JSON_HEADERS,
+            timeout=timeout
+        ) as response:
+            return orjson.loads(response.content)
+
+    def _open_session(self, session_id: str) -> bool:
+        """Erstellt eine FlareSolverr-Session (eine evtl. verwaiste gleichnamige vorher löschen)."""
         try:
-            # Alte Session löschen
-            requests.post(self.base_url, json={
+            self._post({
                 'cmd': 'sessions.destroy',
-                'session': self.session_id
+                'session': session_id
             }, timeout=30)
         except Exception:
             pass
 
         try:
-            response = requests.post(self.base_url, json={
+            data = self._post({
                 'cmd': 'sessions.create',
-                'session': self.session_id
+                'session': session_id
             }, timeout=60)
-
-            data = response.json()
-            self.session_active = data.get('status') == 'ok'
-            return self.session_active
+            return data.get('status') == 'ok'
 
         except Exception as e:
-            logger.error(f"Session-Erstellung fehlgeschlagen: {e}")
+            logger.error("Session-Erstellung fehlgeschlagen (%s): %s", session_id, e)
             return False
 
+    def create_session(self) -> bool:
+        """Erstellt die erste Session; weitere Worker-Sessions entstehen bei Bedarf."""
+        self.session_active = self._open_session(self.session_id)
+
+        if self.session_active:
+            with self._sessions_lock:
+                self._sessions.append(self.session_id)
+                self._open_sessions.add(self.session_id)
+                self._free_sessions.append(self.session_id)
+
+        return self.session_active
+
+    def _thread_session(self) -> Optional[str]:
+        """Liefert die Session des aktuellen Threads und erstellt sie beim ersten Aufruf."""
+        if not self.session_active:
+            return None
+
+        session_id = getattr(self._local, 'session_id', None)
+        if session_id is not None:
+            return session_id
+
+        with self._sessions_lock:
+            if self._free_sessions:
+                session_id = self._free_sessions.pop()
+            else:
+                self._session_counter += 1
+                session_id = f"{self.session_id}_{self._session_counter}"
+                # Sofort registrieren: auch ein bei uns abgelaufenes, in
+                # FlareSolverr aber fertiges create räumt destroy_session() ab
+                self._sessions.append(session_id)
+            is_open = session_id in self._open_sessions
+
+        if not is_open:
+            if not self._open_session(session_id):
+                # Namen für den nächsten Versuch zurücklegen statt neu zu zählen
+                with self._sessions_lock:
+                    self._free_sessions.append(session_id)
+                return None
+            with self._sessions_lock:
+                self._open_sessions.add(session_id)
+
+        self._local.session_id = session_id
+        return session_id
+
     def destroy_session(self):
-        """Zerstört die aktuelle Session."""
-        try:
-            requests.post(self.base_url, json={
-                'cmd': 'sessions.destroy',
-                'session': self.session_id
-            }, timeout=30)
-        except Exception:
-            pass
+        """Zerstört alle Sessions (auch die der Worker-Threads)."""
+        with self._sessions_lock:
+            sessions = self._sessions
+            self._sessions = []
+            self._open_sessions = set()
+            self._free_sessions = []
+
+        for session_id in sessions:
+            try:
+                self._post({
+                    'cmd': 'sessions.destroy',
+                    'session': session_id
+                }, timeout=30)
+            except Exception:
+                pass
+
+        self._local.session_id = None
         self.session_active = False
 
     def fetch(self, url: str, timeout: int = REQUEST_TIMEOUT_SEC) -> Tuple[Optional[str], Optional[int], Optional[str]]:
@@ -1010,16 +1291,18 @@ class FlareSolverrClient:
         Returns:
             Tuple von (html, http_status, error_message)
         """
+        session_id = self._thread_session()
+        if session_id is None:
+            return None, None, 'FlareSolverr-Session konnte nicht erstellt werden'
+
         try:
-            response = requests.post(self.base_url, json={
+            data = self._post({
                 'cmd': 'request.get',
                 'url': url,
-                'session': self.session_id,
+                'session': session_id,
                 'maxTimeout': timeout * 1000
             }, timeout=timeout + 30)
 
-            data = response.json()
-
             if data.get('status') == 'ok' and data.get('solution'):
                 solution = data['solution']
                 html = solution.get('response', '')
@@ -1037,7 +1320,7 @@ class FlareSolverrClient:
             return None, None, str(e)
 
     def fetch_with_retry(self, url: str, max_retries: int = MAX_RETRIES) -> Tuple[Optional[str], Optional[int], Optional[str]]:
-        """Fetch mit exponential backoff."""
+        """Fetch mit exponential backoff (begrenzt, mit Jitter)."""
         last_error = None
 
         for attempt in range(max_retries):
@@ -1049,8 +1332,11 @@ class FlareSolverrClient:
             last_error = error
 
             if attempt < max_retries - 1:
-                wait_time = 2 ** (attempt + 1)  # 2, 4, 8 Sekunden
-                logger.warning(f"Retry {attempt + 1}/{max_retries} in {wait_time}s: {error}")
+                # 2, 4, 8 ... Sekunden (max. 30), gestreut auf 50-150 %, damit
+                # parallele Worker nach einem FlareSolverr-Aussetzer nicht
+                # gleichzeitig wieder anfragen
+                wait_time = min(RETRY_BACKOFF_MAX_SEC, 2 ** (attempt + 1)) * (0.5 + random.random())
+                logger.warning("Retry %d/%d in %.1fs: %s", attempt + 1, max_retries, wait_time, error)
                 time.sleep(wait_time)
 
         return None, None, last_error
@@ -1063,10 +1349,27 @@ class FlareSolverrClient:
 class DatabaseManager:
     """Manager für Datenbankoperationen."""
 
+    # Statements der Bulk-Inserts, einmal beim Import aufgebaut
+    OFFER_INSERT_HEAD = """
+        INSERT INTO offer_snapshot
+        (scan_id, position, article_url, article_id, price_item, shipping, total,
+         currency, quantity, `condition`, language, is_foil, seller_name, seller_id,
+         seller_country, seller_rating, seller_sales, flags_json)
+        VALUES """
+    OFFER_ROW_PLACEHOLDERS = '(' + ', '.join(['%s'] * 18) + ')'
+
+    DEAL_ALERT_INSERT = """
+        INSERT INTO deal_alert
+        (ts, scan_id, article_id, article_url, total, baseline, discount_pct,
+         reason, card_name, set_code, karten_nummer, land, foil, seller_name,
+         `condition`, meta_json)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+
     def __init__(self):
         self.pool = pooling.MySQLConnectionPool(
             pool_name="cardmarket_pool",
-            pool_size=5,
+            pool_size=max(5, SCAN_CONCURRENCY + 1),  # <= 32 (siehe SCAN_CONCURRENCY)
             host=DB_HOST,
             port=DB_PORT,
             user=DB_USER,
@@ -1081,6 +1384,41 @@ class DatabaseManager:
         """Holt eine Connection aus dem Pool."""
         return self.pool.get_connection()
 
+    @contextmanager
+    def scan_transaction(self):
+        """
+        Eine Connection und eine Transaktion für alle Schreibvorgänge eines Scans.
+
+        Commit beim Verlassen, Rollback bei Exception.
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connection(self, conn=None, commit: bool = True):
+        """
+        Liefert die übergebene Connection (Transaktion des Aufrufers)
+        oder eine eigene aus dem Pool, die danach committet wird.
+        """
+        if conn is not None:
+            yield conn
+            return
+
+        own = self.get_connection()
+        try:
+            yield own
+            if commit:
+                own.commit()
+        finally:
+            own.close()
+
     def get_watchlist(self) -> List[Dict]:
         """Lädt die aktive Watchlist."""
         conn = self.get_connection()
@@ -1103,86 +1441,61 @@ class DatabaseManager:
         set_code: str,
         karten_nummer: str,
         land: str,
-        foil: bool
+        foil: bool,
+        ok: bool = False,
+        http_status: Optional[int] = None,
+        error: Optional[str] = None,
+        product_id: Optional[str] = None,
+        ts: Optional[datetime] = None,
+        conn=None
     ) -> int:
-        """Erstellt einen neuen scan_run Eintrag."""
-        conn = self.get_connection()
-        try:
+        """
+        Schreibt einen vollständigen scan_run Eintrag (ein INSERT nach dem Scan).
+
+        Args:
+            ts: Startzeitpunkt des Scans (Standard: jetzt)
+        """
+        with self._connection(conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO scan_run
-                (ts, watchlist_id, product_url, card_name, set_code, karten_nummer, land, foil, ok, parse_version)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, %s)
+                (ts, watchlist_id, product_url, product_id, card_name, set_code, karten_nummer,
+                 land, foil, ok, http_status, error, parse_version)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
-                utc_now(),
+                ts or utc_now(),
                 watchlist_id,
                 product_url,
+                product_id,
                 card_name,
                 set_code,
                 karten_nummer,
                 land,
                 1 if foil else 0,
-                PARSE_VERSION
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
-
-    def update_scan_run(
-        self,
-        scan_id: int,
-        ok: bool,
-        http_status: Optional[int] = None,
-        error: Optional[str] = None,
-        product_id: Optional[str] = None
-    ):
-        """Aktualisiert einen scan_run Eintrag."""
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE scan_run
-                SET ok = %s, http_status = %s, error = %s, product_id = %s
-                WHERE id = %s
-            """, (
                 1 if ok else 0,
                 http_status,
                 error[:65000] if error else None,  # TEXT limit
-                product_id,
-                scan_id
+                PARSE_VERSION
             ))
-            conn.commit()
-        finally:
-            conn.close()
+            return cursor.lastrowid
 
-    def bulk_insert_offers(self, scan_id: int, offers: List[Offer]):
+    def bulk_insert_offers(self, scan_id: int, offers: List[Offer], conn=None):
         """Fügt mehrere Angebote per Bulk-Insert ein."""
         if not offers:
             return
 
-        conn = self.get_connection()
-        try:
+        with self._connection(conn) as conn:
             cursor = conn.cursor()
 
-            sql = """
-                INSERT INTO offer_snapshot
-                (scan_id, position, article_url, article_id, price_item, shipping, total,
-                 currency, quantity, `condition`, language, is_foil, seller_name, seller_id,
-                 seller_country, seller_rating, seller_sales, flags_json)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-
-            values = []
-            for offer in offers:
-                values.append((
+            values = [
+                (
                     scan_id,
                     offer.position,
                     offer.article_url,
                     offer.article_id,
-                    float(offer.price_item) if offer.price_item else None,
-                    float(offer.shipping) if offer.shipping else None,
-                    float(offer.total) if offer.total else None,
+                    offer.price_item or None,
+                    offer.shipping or None,
+                    offer.total or None,
                     offer.currency,
                     offer.quantity,
                     offer.condition,
@@ -1193,19 +1506,20 @@ class DatabaseManager:
                     offer.seller_country,
                     offer.seller_rating,
                     offer.seller_sales,
-                    json.dumps(offer.flags) if offer.flags else None
-                ))
-
-            cursor.executemany(sql, values)
-            conn.commit()
+                    orjson.dumps(offer.flags).decode() if offer.flags else None
+                )
+                for offer in offers
+            ]
 
-        finally:
-            conn.close()
+            # Ein mehrzeiliges INSERT je Block: ein Paket, ein Parse auf dem Server
+            for start in range(0, len(values), OFFER_INSERT_CHUNK):
+                chunk = values[start:start + OFFER_INSERT_CHUNK]
+                sql = self.OFFER_INSERT_HEAD + ', '.join([self.OFFER_ROW_PLACEHOLDERS] * len(chunk))
+                cursor.execute(sql, [value for row in chunk for value in row])
 
-    def insert_scan_agg(self, scan_id: int, stats: AggregatedStats):
+    def insert_scan_agg(self, scan_id: int, stats: AggregatedStats, conn=None):
         """Fügt aggregierte Statistiken ein."""
-        conn = self.get_connection()
-        try:
+        with self._connection(conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO scan_agg
@@ -1217,22 +1531,19 @@ class DatabaseManager:
                 scan_id,
                 stats.offer_count,
                 stats.seller_count,
-                float(stats.min_total) if stats.min_total else None,
-                float(stats.p10_total) if stats.p10_total else None,
-                float(stats.p25_total) if stats.p25_total else None,
-                float(stats.median_total) if stats.median_total else None,
-                float(stats.p75_total) if stats.p75_total else None,
-                float(stats.p90_total) if stats.p90_total else None,
-                float(stats.max_total) if stats.max_total else None,
-                float(stats.trimmed_mean_total) if stats.trimmed_mean_total else None,
-                float(stats.iqr_total) if stats.iqr_total else None,
-                float(stats.stdev_total) if stats.stdev_total else None,
-                float(stats.mean_total) if stats.mean_total else None,
-                float(stats.mode_total) if stats.mode_total else None
+                stats.min_total or None,
+                stats.p10_total or None,
+                stats.p25_total or None,
+                stats.median_total or None,
+                stats.p75_total or None,
+                stats.p90_total or None,
+                stats.max_total or None,
+                stats.trimmed_mean_total or None,
+                stats.iqr_total or None,
+                stats.stdev_total or None,
+                stats.mean_total or None,
+                stats.mode_total or None
             ))
-            conn.commit()
-        finally:
-            conn.close()
 
     def get_rolling_baseline(
         self,
@@ -1243,8 +1554,25 @@ class DatabaseManager:
         window_scans: int = BASELINE_WINDOW_SCANS
     ) -> Optional[Decimal]:
         """Berechnet den Rolling-Median der letzten N Scans."""
-        conn = self.get_connection()
-        try:
+        medians = self.get_baseline_window(karten_nummer, set_code, land, foil, window_scans)
+
+        if not medians:
+            return None
+
+        return _to_cents(statistics.median(medians))
+
+    def get_baseline_window(
+        self,
+        karten_nummer: str,
+        set_code: str,
+        land: str,
+        foil: bool,
+        window_scans: int = BASELINE_WINDOW_SCANS,
+        conn=None,
+        exclude_scan_id: Optional[int] = None
+    ) -> List[float]:
+        """Liefert die Mediane der letzten N erfolgreichen Scans (neuester zuerst)."""
+        with self._connection(conn, commit=False) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT sa.median_total
@@ -1255,73 +1583,112 @@ class DatabaseManager:
                 AND sr.land = %s
                 AND sr.foil = %s
                 AND sr.ok = 1
+                AND sr.id <> %s
                 AND sa.median_total IS NOT NULL
                 ORDER BY sr.ts DESC
                 LIMIT %s
-            """, (karten_nummer, set_code, land, 1 if foil else 0, window_scans))
+            """, (karten_nummer, set_code, land, 1 if foil else 0,
+                  exclude_scan_id or 0, window_scans))
 
-            rows = cursor.fetchall()
+            return [float(row[0]) for row in cursor.fetchall()]
 
-            if not rows:
-                return None
+    def get_baseline_windows(
+        self,
+        keys: List[Tuple[str, str, str, bool]],
+        window_scans: int = BASELINE_WINDOW_SCANS
+    ) -> Dict[Tuple[str, str, str, bool], List[float]]:
+        """
+        Liefert die Baseline-Fenster mehrerer Karten mit einer Abfrage.
 
-            medians = [float(row[0]) for row in rows]
-            baseline = statistics.median(medians)
+        Args:
+            keys: (karten_nummer, set_code, land, foil) je Karte
+
+        Returns:
+            Dict Key -> Mediane der letzten N Scans (neuester zuerst)
+        """
+        windows = {key: [] for key in keys}
+        if not windows:
+            return windows
+
+        keys = list(windows)
+        subquery = """
+            (SELECT %s AS k, sr.ts, sa.median_total
+             FROM scan_run sr
+             INNER JOIN scan_agg sa ON sr.id = sa.scan_id
+             WHERE sr.karten_nummer = %s
+             AND sr.set_code = %s
+             AND sr.land = %s
+             AND sr.foil = %s
+             AND sr.ok = 1
+             AND sa.median_total IS NOT NULL
+             ORDER BY sr.ts DESC
+             LIMIT %s)"""
+
+        # Je Karte ein LIMIT-Subquery über idx_scan_run_card_ok_ts, per UNION ALL in einem Roundtrip
+        sql = ' UNION ALL '.join([subquery] * len(keys)) + ' ORDER BY k, ts DESC'
+        params = []
+        for index, (karten_nummer, set_code, land, foil) in enumerate(keys):
+            params.extend((index, karten_nummer, set_code, land, 1 if foil else 0, window_scans))
+
+        with self._connection(commit=False) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
 
-            return Decimal(str(baseline)).quantize(Decimal('0.01'))
+            for index, _, median_total in cursor.fetchall():
+                windows[keys[index]].append(float(median_total))
 
-        finally:
-            conn.close()
+        return windows
 
-    def insert_deal_alert(
+    def insert_deal_alerts(
         self,
         scan_id: int,
-        offer: Offer,
+        deals: List[Tuple[Offer, Decimal, str]],
         baseline: Decimal,
-        discount_pct: Decimal,
-        reason: str,
         card_name: Optional[str],
         set_code: str,
         karten_nummer: str,
         land: str,
-        foil: bool
+        foil: bool,
+        conn=None
     ):
-        """Erstellt einen Deal-Alert."""
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO deal_alert
-                (ts, scan_id, article_id, article_url, total, baseline, discount_pct,
-                 reason, card_name, set_code, karten_nummer, land, foil, seller_name,
-                 `condition`, meta_json)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                utc_now(),
+        """Erstellt die Deal-Alerts eines Scans mit einem executemany (deals: Offer, Rabatt, Grund)."""
+        if not deals:
+            return
+
+        ts = utc_now()
+        foil_flag = 1 if foil else 0
+        rows = [
+            (
+                ts,
                 scan_id,
                 offer.article_id,
                 offer.article_url,
-                float(offer.total) if offer.total else float(offer.price_item),
-                float(baseline),
+                offer.total or offer.price_item,
+                baseline,
                 float(discount_pct),
                 reason,
                 card_name,
                 set_code,
                 karten_nummer,
                 land,
-                1 if foil else 0,
+                foil_flag,
                 offer.seller_name,
                 offer.condition,
-                json.dumps({
+                orjson.dumps({
                     'seller_rating': offer.seller_rating,
                     'seller_sales': offer.seller_sales,
                     'quantity': offer.quantity,
                     'language': offer.language
-                })
-            ))
-            conn.commit()
-        finally:
-            conn.close()
+                }).decode()
+            )
+            for offer, discount_pct, reason in deals
+        ]
+
+        with self._connection(conn) as conn:
+            cursor = conn.cursor()
+            # Ohne prepared=True: nur dann fasst der Connector die Zeilen
+            # zu einem mehrzeiligen INSERT zusammen
+            cursor.executemany(self.DEAL_ALERT_INSERT, rows)
 
     def save_legacy_price_history(
         self,
@@ -1333,11 +1700,11 @@ class DatabaseManager:
         max_price: float,
         num_offers: int,
         country: str,
-        is_foil: bool
+        is_foil: bool,
+        conn=None
     ):
         """Speichert in der alten preis_historie Tabelle (Kompatibilität)."""
-        conn = self.get_connection()
-        try:
+        with self._connection(conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO preis_historie
@@ -1350,9 +1717,6 @@ class DatabaseManager:
                 num_offers, country, 1 if is_foil else 0,
                 utc_now()
             ))
-            conn.commit()
-        finally:
-            conn.close()
 
 
 # ============================================
@@ -1364,6 +1728,62 @@ class DealDetector:
 
     def __init__(self, db: DatabaseManager):
         self.db = db
+        # Rolling-Fenster der Scan-Mediane je (Nummer, Set, Land, Foil), neuester zuletzt
+        self._windows: Dict[Tuple[str, str, str, bool], deque] = {}
+        self._lock = threading.Lock()
+
+    def _get_baseline(
+        self,
+        key: Tuple[str, str, str, bool],
+        scan_id: Optional[int],
+        median_total: Optional[Decimal],
+        conn=None
+    ) -> Optional[Decimal]:
+        """
+        Rolling-Median aus dem Fenster im Speicher; die DB wird je Karte nur einmal gelesen.
+
+        Das Fenster enthält nur committete Scans. Der aktuelle Median zählt
+        für die Baseline mit, wird aber erst nach dem Commit per push_median()
+        übernommen, damit ein Rollback keinen Wert im Speicher hinterlässt.
+        """
+        with self._lock:
+            window = self._windows.get(key)
+
+        if window is None:
+            # Erster Zugriff: Fenster aus der DB, ohne den noch offenen Scan
+            medians = self.db.get_baseline_window(
+                *key, BASELINE_WINDOW_SCANS, conn=conn, exclude_scan_id=scan_id
+            )
+            window = deque(reversed(medians), maxlen=BASELINE_WINDOW_SCANS)
+            with self._lock:
+                window = self._windows.setdefault(key, window)
+
+        with self._lock:
+            values = list(window)
+        if median_total is not None:
+            values = (values + [float(median_total)])[-BASELINE_WINDOW_SCANS:]
+
+        if not values:
+            return None
+
+        return _to_cents(statistics.median(values))
+
+    def push_median(self, key: Tuple[str, str, str, bool], median_total: Optional[Decimal]):
+        """Übernimmt den Median eines committeten Scans ins Fenster."""
+        if median_total is None:
+            return
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None:
+                window.append(float(median_total))
+
+    def warm(self, keys: List[Tuple[str, str, str, bool]]):
+        """Lädt die Baseline-Fenster aller Karten vor dem Scan mit einer Abfrage."""
+        windows = self.db.get_baseline_windows(keys, BASELINE_WINDOW_SCANS)
+
+        with self._lock:
+            for key, medians in windows.items():
+                self._windows[key] = deque(reversed(medians), maxlen=BASELINE_WINDOW_SCANS)
 
     def detect_deals(
         self,
@@ -1373,23 +1793,30 @@ class DealDetector:
         set_code: str,
         karten_nummer: str,
         land: str,
-        foil: bool
+        foil: bool,
+        median_total: Optional[Decimal] = None,
+        conn=None
     ) -> List[Offer]:
         """
         Erkennt Deals unter den Angeboten.
 
+        Args:
+            median_total: Median des aktuellen Scans (zählt für die Baseline
+                mit; ins Fenster übernimmt ihn erst push_median() nach dem Commit)
+            conn: Connection der laufenden Scan-Transaktion (optional)
+
         Returns:
             Liste der als Deal erkannten Offers
         """
-        baseline = self.db.get_rolling_baseline(
-            karten_nummer, set_code, land, foil, BASELINE_WINDOW_SCANS
+        baseline = self._get_baseline(
+            (karten_nummer, set_code, land, foil), scan_id, median_total, conn
         )
 
         if not baseline:
-            logger.debug(f"Keine Baseline verfügbar für {card_name} - überspringe Deal-Detection")
+            logger.debug("Keine Baseline verfügbar für %s - überspringe Deal-Detection", card_name)
             return []
 
-        threshold_price = baseline * Decimal(str(1 - DEAL_THRESHOLD))
+        threshold_price = baseline * _DEAL_FACTOR
         deals = []
 
         for offer in offers:
@@ -1414,23 +1841,23 @@ class DealDetector:
             discount_pct = (price - baseline) / baseline
             reason = f"Preis {float(price):.2f}€ ist {abs(float(discount_pct)*100):.1f}% unter Baseline {float(baseline):.2f}€"
 
-            self.db.insert_deal_alert(
-                scan_id=scan_id,
-                offer=offer,
-                baseline=baseline,
-                discount_pct=discount_pct,
-                reason=reason,
-                card_name=card_name,
-                set_code=set_code,
-                karten_nummer=karten_nummer,
-                land=land,
-                foil=foil
-            )
+            deals.append((offer, discount_pct, reason))
+            logger.info("  DEAL: %s - %.2f€ (%.1f%% Rabatt)", card_name, price, discount_pct * 100)
 
-            deals.append(offer)
-            logger.info(f"  DEAL: {card_name} - {float(price):.2f}€ ({float(discount_pct)*100:.1f}% Rabatt)")
+        # Alle Alerts des Scans in einem Roundtrip schreiben
+        self.db.insert_deal_alerts(
+            scan_id=scan_id,
+            deals=deals,
+            baseline=baseline,
+            card_name=card_name,
+            set_code=set_code,
+            karten_nummer=karten_nummer,
+            land=land,
+            foil=foil,
+            conn=conn
+        )
 
-        return deals
+        return [offer for offer, _, _ in deals]
 
 
 # ============================================
@@ -1457,39 +1884,41 @@ class CardmarketScanner:
         card_name = get_card_name(card_number, set_code)
 
         if not card_name:
-            logger.warning(f"Karte nicht gefunden: {card_number} ({set_code})")
+            logger.warning("Karte nicht gefunden: %s (%s)", card_number, set_code)
             return False
 
         url = generate_cardmarket_url(set_code, card_name, country, is_foil)
-        logger.info(f"Scanne: {card_name} ({set_code}) [{country}]{' FOIL' if is_foil else ''}")
-
-        # scan_run erstellen
-        scan_id = self.db.create_scan_run(
-            watchlist_id=watchlist_id,
-            product_url=url,
-            card_name=card_name,
-            set_code=set_code,
-            karten_nummer=card_number,
-            land=country,
-            foil=is_foil
-        )
+        logger.info("Scanne: %s (%s) [%s]%s", card_name, set_code, country, ' FOIL' if is_foil else '')
+
+        # scan_run wird erst nach dem Scan vollständig geschrieben;
+        # ts bleibt der Startzeitpunkt
+        scan_run = {
+            'watchlist_id': watchlist_id,
+            'product_url': url,
+            'card_name': card_name,
+            'set_code': set_code,
+            'karten_nummer': card_number,
+            'land': country,
+            'foil': is_foil,
+            'ts': utc_now(),
+        }
 
         try:
             # HTML abrufen
             html, http_status, error = self.client.fetch_with_retry(url)
 
             if not html:
-                self.db.update_scan_run(scan_id, ok=False, http_status=http_status, error=error)
-                logger.warning(f"  Fehler: {error}")
+                self.db.create_scan_run(**scan_run, http_status=http_status, error=error)
+                logger.warning("  Fehler: %s", error)
                 return False
 
             # Prüfen ob Seite gefunden wurde
             if 'Product not found' in html or 'Page not found' in html:
-                self.db.update_scan_run(
-                    scan_id, ok=False, http_status=404,
+                self.db.create_scan_run(
+                    **scan_run, http_status=404,
                     error='Produkt nicht auf Cardmarket gefunden'
                 )
-                logger.warning(f"  Produkt nicht gefunden")
+                logger.warning("  Produkt nicht gefunden")
                 return False
 
             # HTML parsen
@@ -1497,72 +1926,91 @@ class CardmarketScanner:
             offers = parser.parse(MAX_OFFERS_PER_SCAN)
             product_id = parser.extract_product_id()
 
+            # Baum und Roh-HTML vor den DB-Schreibvorgängen freigeben
+            parser.close()
+            del html
+
             if not offers:
-                self.db.update_scan_run(
-                    scan_id, ok=False, http_status=http_status,
+                self.db.create_scan_run(
+                    **scan_run, http_status=http_status,
                     error='Keine Angebote gefunden', product_id=product_id
                 )
-                logger.warning(f"  Keine Angebote gefunden")
+                logger.warning("  Keine Angebote gefunden")
                 return False
 
-            # Angebote speichern
-            self.db.bulk_insert_offers(scan_id, offers)
-
-            # Aggregation berechnen und speichern
             stats = calculate_aggregates(offers)
-            self.db.insert_scan_agg(scan_id, stats)
 
-            # scan_run als erfolgreich markieren
-            self.db.update_scan_run(
-                scan_id, ok=True, http_status=http_status, product_id=product_id
-            )
+            # Alle Schreibvorgänge des Scans auf einer Connection in einer
+            # Transaktion
+            with self.db.scan_transaction() as conn:
+                # Erfolgreichen scan_run anlegen
+                scan_id = self.db.create_scan_run(
+                    **scan_run, ok=True, http_status=http_status,
+                    product_id=product_id, conn=conn
+                )
 
-            # Legacy-Kompatibilität: auch in preis_historie schreiben
-            if stats.min_total and stats.mean_total and stats.max_total:
-                self.db.save_legacy_price_history(
+                # Angebote und Aggregation speichern
+                self.db.bulk_insert_offers(scan_id, offers, conn=conn)
+                self.db.insert_scan_agg(scan_id, stats, conn=conn)
+
+                # Legacy-Kompatibilität: auch in preis_historie schreiben
+                if stats.min_total and stats.mean_total and stats.max_total:
+                    self.db.save_legacy_price_history(
+                        card_name=card_name,
+                        card_number=card_number,
+                        set_code=set_code,
+                        min_price=float(stats.min_total),
+                        avg_price=float(stats.mean_total),
+                        max_price=float(stats.max_total),
+                        num_offers=stats.offer_count,
+                        country=country,
+                        is_foil=is_foil,
+                        conn=conn
+                    )
+
+                # Deal-Detection
+                deals = self.deal_detector.detect_deals(
+                    scan_id=scan_id,
+                    offers=offers,
                     card_name=card_name,
-                    card_number=card_number,
                     set_code=set_code,
-                    min_price=float(stats.min_total),
-                    avg_price=float(stats.mean_total),
-                    max_price=float(stats.max_total),
-                    num_offers=stats.offer_count,
-                    country=country,
-                    is_foil=is_foil
+                    karten_nummer=card_number,
+                    land=country,
+                    foil=is_foil,
+                    median_total=stats.median_total,
+                    conn=conn
                 )
 
-            # Deal-Detection
-            deals = self.deal_detector.detect_deals(
-                scan_id=scan_id,
-                offers=offers,
-                card_name=card_name,
-                set_code=set_code,
-                karten_nummer=card_number,
-                land=country,
-                foil=is_foil
+            # Erst nach dem Commit ins Baseline-Fenster übernehmen
+            self.deal_detector.push_median(
+                (card_number, set_code, country, is_foil), stats.median_total
             )
 
             # Logging
             logger.info(
-                f"  OK: {stats.offer_count} Angebote, "
-                f"Median: {stats.median_total}€, "
-                f"Range: {stats.min_total}€ - {stats.max_total}€"
-                + (f", {len(deals)} Deals!" if deals else "")
+                "  OK: %d Angebote, Median: %s€, Range: %s€ - %s€%s",
+                stats.offer_count, stats.median_total, stats.min_total, stats.max_total,
+                f", {len(deals)} Deals!" if deals else ""
             )
 
             return True
 
         except Exception as e:
-            self.db.update_scan_run(scan_id, ok=False, error=str(e))
-            logger.error(f"  Exception: {e}")
+            logger.error("  Exception: %s", e)
+            # Transaktion ist zurückgerollt: Fehlschlag als eigenen scan_run festhalten
+            # (bei einem DB-Ausfall schlägt auch das fehl, der Fehler ist dann geloggt)
+            try:
+                self.db.create_scan_run(**scan_run, error=str(e))
+            except Exception as db_error:
+                logger.error("  Fehlschlag nicht gespeichert: %s", db_error)
             return False
 
     def run_scheduled_scan(self):
         """Führt einen vollständigen Watchlist-Scan durch."""
         logger.info("=" * 60)
         logger.info("Cardmarket Scanner v2 - Geplanter Scan")
-        logger.info(f"Zeitpunkt: {utc_now().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-        logger.info(f"Parser-Version: {PARSE_VERSION}")
+        logger.info("Zeitpunkt: %s UTC", utc_now().strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("Parser-Version: %s", PARSE_VERSION)
         logger.info("=" * 60)
 
         # Watchlist laden
@@ -1572,7 +2020,13 @@ class CardmarketScanner:
             logger.info("Watchlist ist leer.")
             return
 
-        logger.info(f"Watchlist: {len(watchlist)} Karten")
+        logger.info("Watchlist: %d Karten", len(watchlist))
+
+        # Baselines aller Karten vorab laden (der Scan erweitert sie dann im Speicher)
+        self.deal_detector.warm([
+            (item['karten_nummer'], item['set_code'], item['land'], bool(item['foil']))
+            for item in watchlist
+        ])
 
         # FlareSolverr-Session erstellen
         if not self.client.create_session():
@@ -1580,37 +2034,64 @@ class CardmarketScanner:
             return
 
         try:
-            scanned = 0
-            errors = 0
+            scanned, errors = self.scan_all(watchlist)
 
-            for item in watchlist:
-                try:
-                    success = self.scan_card(
-                        watchlist_id=item['id'],
-                        card_number=item['karten_nummer'],
-                        set_code=item['set_code'],
-                        country=item['land'],
-                        is_foil=bool(item['foil'])
-                    )
+            logger.info("-" * 60)
+            logger.info("Scan abgeschlossen: %d erfolgreich, %d Fehler", scanned, errors)
+
+        finally:
+            self.client.destroy_session()
+            logger.info("Session beendet")
+
+    def scan_all(self, watchlist: List[Dict]) -> Tuple[int, int]:
+        """
+        Scannt alle Watchlist-Einträge parallel.
 
-                    if success:
+        Die Wartezeit auf FlareSolverr ist I/O-gebunden, daher laufen bis zu
+        SCAN_CONCURRENCY Scans gleichzeitig, jeder Worker mit eigener
+        FlareSolverr-Session (siehe FlareSolverrClient._thread_session).
+        Ein gemeinsamer TokenBucket
+        begrenzt die Anfragerate weiterhin auf eine Karte pro
+        SLEEP_BETWEEN_CARDS_SEC.
+
+        Returns:
+            Tuple von (erfolgreich, fehler)
+        """
+        bucket = TokenBucket(SLEEP_BETWEEN_CARDS_SEC)
+        scanned = 0
+        errors = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, SCAN_CONCURRENCY)) as executor:
+            futures = {
+                executor.submit(self._scan_item, item, bucket): item
+                for item in watchlist
+            }
+
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    if future.result():
                         scanned += 1
                     else:
                         errors += 1
-
-                    # Rate limiting
-                    time.sleep(SLEEP_BETWEEN_CARDS_SEC)
-
                 except Exception as e:
-                    logger.error(f"Fehler bei Karte {item['karten_nummer']}: {e}")
+                    logger.error("Fehler bei Karte %s: %s", item['karten_nummer'], e)
                     errors += 1
 
-            logger.info("-" * 60)
-            logger.info(f"Scan abgeschlossen: {scanned} erfolgreich, {errors} Fehler")
+        return scanned, errors
 
-        finally:
-            self.client.destroy_session()
-            logger.info("Session beendet")
+    def _scan_item(self, item: Dict, bucket: TokenBucket) -> bool:
+        """Scannt einen Watchlist-Eintrag (Worker-Thread)."""
+        # Rate limiting
+        bucket.acquire()
+
+        return self.scan_card(
+            watchlist_id=item['id'],
+            card_number=item['karten_nummer'],
+            set_code=item['set_code'],
+            country=item['land'],
+            is_foil=bool(item['foil'])
+        )
 
     def test_single_card(self, card_number: str, set_code: str, country: str, is_foil: bool = False):
         """Testet eine einzelne Karte ohne DB-Speicherung (außer scan_run)."""
@@ -1784,38 +2265,46 @@ def main():
         conn = scanner.db.get_connection()
         try:
             cursor = conn.cursor(dictionary=True)
+            # Aggregation in MySQL über die letzten 100 Scans: eine Zeile statt 100
             cursor.execute("""
-                SELECT sr.ts, sa.*
-                FROM scan_run sr
-                INNER JOIN scan_agg sa ON sr.id = sa.scan_id
-                WHERE sr.karten_nummer = %s
-                AND sr.set_code = %s
-                AND sr.land = %s
-                AND sr.ok = 1
-                AND sr.ts >= DATE_SUB(NOW(), INTERVAL %s DAY)
-                ORDER BY sr.ts DESC
-                LIMIT 100
+                SELECT
+                    COUNT(*) AS scans,
+                    MIN(median_total) AS median_min,
+                    MAX(median_total) AS median_max,
+                    AVG(median_total) AS median_avg,
+                    MIN(min_total) AS min_min,
+                    MAX(min_total) AS min_max,
+                    AVG(min_total) AS min_avg
+                FROM (
+                    SELECT sa.median_total, sa.min_total
+                    FROM scan_run sr
+                    INNER JOIN scan_agg sa ON sr.id = sa.scan_id
+                    WHERE sr.karten_nummer = %s
+                    AND sr.set_code = %s
+                    AND sr.land = %s
+                    AND sr.ok = 1
+                    AND sr.ts >= DATE_SUB(NOW(), INTERVAL %s DAY)
+                    ORDER BY sr.ts DESC
+                    LIMIT 100
+                ) recent
             """, (card_number, set_code, country, days))
 
-            rows = cursor.fetchall()
+            row = cursor.fetchone()
 
-            if not rows:
+            if not row or not row['scans']:
                 print(f"Keine Daten für {card_name} ({set_code}) in den letzten {days} Tagen.")
                 return
 
             print(f"\nStatistiken für {card_name} ({set_code}) [{country}]")
-            print(f"Letzte {days} Tage, {len(rows)} Scans\n")
-
-            medians = [float(r['median_total']) for r in rows if r['median_total']]
-            mins = [float(r['min_total']) for r in rows if r['min_total']]
+            print(f"Letzte {days} Tage, {row['scans']} Scans\n")
 
-            if medians:
-                print(f"Median-Bereich:  {min(medians):.2f}€ - {max(medians):.2f}€")
-                print(f"Durchschn. Median: {statistics.mean(medians):.2f}€")
+            if row['median_avg'] is not None:
+                print(f"Median-Bereich:  {row['median_min']:.2f}€ - {row['median_max']:.2f}€")
+                print(f"Durchschn. Median: {row['median_avg']:.2f}€")
 
-            if mins:
-                print(f"Min-Bereich:     {min(mins):.2f}€ - {max(mins):.2f}€")
-                print(f"Durchschn. Min:  {statistics.mean(mins):.2f}€")
+            if row['min_avg'] is not None:
+                print(f"Min-Bereich:     {row['min_min']:.2f}€ - {row['min_max']:.2f}€")
+                print(f"Durchschn. Min:  {row['min_avg']:.2f}€")
 
             baseline = scanner.db.get_rolling_baseline(card_number, set_code, country, False)
             if baseline:
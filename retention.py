@@ -8,7 +8,7 @@ Features:
 - Löscht alte offer_snapshot Einträge (detaillierte Daten)
 - Behält scan_agg Aggregationen länger
 - Archiviert oder löscht alte Deal-Alerts
-- Optimiert Tabellen nach dem Löschen
+- Optimiert Tabellen nach dem Löschen (optional, RETENTION_OPTIMIZE)
 
 Verwendung:
     python3 retention.py              # Dry-Run (zeigt was gelöscht würde)
@@ -23,6 +23,7 @@ import os
 import sys
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Tuple
 
@@ -56,6 +57,12 @@ RETENTION_LEGACY_DAYS = int(os.getenv('RETENTION_LEGACY_DAYS', '365'))
 # Batch-Größe für Löschoperationen
 DELETE_BATCH_SIZE = int(os.getenv('DELETE_BATCH_SIZE', '10000'))
 
+# OPTIMIZE TABLE nach dem Löschen (baut InnoDB-Tabellen komplett neu auf)
+RETENTION_OPTIMIZE = os.getenv('RETENTION_OPTIMIZE', 'false').lower() in ('1', 'true', 'yes')
+
+# Mindestanteil freien Platzes (in % der Daten), ab dem eine Tabelle optimiert wird
+OPTIMIZE_MIN_FREE_PCT = float(os.getenv('OPTIMIZE_MIN_FREE_PCT', '20'))
+
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
@@ -140,7 +147,7 @@ def get_table_stats(conn) -> Dict[str, Dict]:
             }
 
         except mysql.connector.Error as e:
-            logger.warning(f"Konnte Stats für {table} nicht abrufen: {e}")
+            logger.warning("Konnte Stats für %s nicht abrufen: %s", table, e)
             stats[table] = {'rows': 0, 'data_mb': 0, 'index_mb': 0, 'oldest': None, 'newest': None}
 
     return stats
@@ -172,126 +179,100 @@ def print_stats(stats: Dict[str, Dict]):
 # RETENTION-LOGIK
 # ============================================
 
-def count_deletable_offers(conn, cutoff_date: datetime) -> int:
-    """Zählt zu löschende offer_snapshot Einträge."""
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM offer_snapshot os
-        INNER JOIN scan_run sr ON os.scan_id = sr.id
-        WHERE sr.ts < %s
-    """, (cutoff_date,))
-    return cursor.fetchone()[0]
-
-
-def count_deletable_scans(conn, cutoff_date: datetime) -> Tuple[int, int]:
-    """Zählt zu löschende scan_run und scan_agg Einträge."""
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT COUNT(*) FROM scan_run WHERE ts < %s", (cutoff_date,))
-    scan_count = cursor.fetchone()[0]
-
+def count_all(
+    conn,
+    offer_cutoff: datetime,
+    scan_cutoff: datetime,
+    deal_cutoff: datetime,
+    legacy_cutoff: datetime
+) -> Dict[str, int]:
+    """Zählt alle zu löschenden Einträge mit einer Abfrage (Dry-Run)."""
+    cursor = conn.cursor(dictionary=True)
     cursor.execute("""
-        SELECT COUNT(*)
-        FROM scan_agg sa
-        INNER JOIN scan_run sr ON sa.scan_id = sr.id
-        WHERE sr.ts < %s
-    """, (cutoff_date,))
-    agg_count = cursor.fetchone()[0]
-
-    return scan_count, agg_count
-
-
-def count_deletable_deals(conn, cutoff_date: datetime) -> int:
-    """Zählt zu löschende deal_alert Einträge."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM deal_alert WHERE ts < %s", (cutoff_date,))
-    return cursor.fetchone()[0]
-
-
-def count_deletable_legacy(conn, cutoff_date: datetime) -> int:
-    """Zählt zu löschende preis_historie Einträge."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM preis_historie WHERE zeitstempel < %s", (cutoff_date,))
-    return cursor.fetchone()[0]
-
-
-def delete_old_offers(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
+        SELECT
+            (SELECT COUNT(*)
+             FROM offer_snapshot os
+             INNER JOIN scan_run sr ON os.scan_id = sr.id
+             WHERE sr.ts < %s) AS offers,
+            (SELECT COUNT(*) FROM scan_run WHERE ts < %s) AS scans,
+            (SELECT COUNT(*)
+             FROM scan_agg sa
+             INNER JOIN scan_run sr ON sa.scan_id = sr.id
+             WHERE sr.ts < %s) AS aggs,
+            (SELECT COUNT(*) FROM deal_alert WHERE ts < %s) AS deals,
+            (SELECT COUNT(*) FROM preis_historie WHERE zeitstempel < %s) AS legacy
+    """, (offer_cutoff, scan_cutoff, scan_cutoff, deal_cutoff, legacy_cutoff))
+    row = cursor.fetchone()
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+def delete_old_offers(conn, cutoff_date: datetime) -> int:
     """Löscht alte offer_snapshot Einträge in Batches."""
-    if dry_run:
-        return count_deletable_offers(conn, cutoff_date)
-
     cursor = conn.cursor()
     total_deleted = 0
 
     while True:
-        # Batch von scan_ids finden
+        # Ein Statement je Batch: LIMIT in der Derived Table (Scans, die noch
+        # Angebote haben), das DELETE läuft dann über idx_offer_scan_id
         cursor.execute("""
-            SELECT DISTINCT os.scan_id
-            FROM offer_snapshot os
-            INNER JOIN scan_run sr ON os.scan_id = sr.id
-            WHERE sr.ts < %s
-            LIMIT %s
-        """, (cutoff_date, DELETE_BATCH_SIZE // 10))
-
-        scan_ids = [row[0] for row in cursor.fetchall()]
-
-        if not scan_ids:
-            break
-
-        # Offers für diese scan_ids löschen
-        placeholders = ','.join(['%s'] * len(scan_ids))
-        cursor.execute(f"DELETE FROM offer_snapshot WHERE scan_id IN ({placeholders})", scan_ids)
+            DELETE os FROM offer_snapshot os
+            INNER JOIN (
+                SELECT sr.id FROM scan_run sr
+                WHERE sr.ts < %s
+                AND EXISTS (SELECT 1 FROM offer_snapshot o WHERE o.scan_id = sr.id)
+                ORDER BY sr.ts
+                LIMIT %s
+            ) b ON os.scan_id = b.id
+        """, (cutoff_date, max(1, DELETE_BATCH_SIZE // 10)))
         deleted = cursor.rowcount
         conn.commit()
 
-        total_deleted += deleted
-        logger.info(f"  Gelöscht: {deleted} offer_snapshot Einträge (Gesamt: {total_deleted})")
-
-        if deleted < DELETE_BATCH_SIZE:
+        if not deleted:
             break
 
+        total_deleted += deleted
+        logger.info("  Gelöscht: %d offer_snapshot Einträge (Gesamt: %d)", deleted, total_deleted)
+
     return total_deleted
 
 
-def delete_old_scans(conn, cutoff_date: datetime, dry_run: bool = True) -> Tuple[int, int]:
+def delete_old_scans(conn, cutoff_date: datetime) -> Tuple[int, int]:
     """Löscht alte scan_run und scan_agg Einträge."""
-    if dry_run:
-        return count_deletable_scans(conn, cutoff_date)
-
     cursor = conn.cursor()
     total_scans = 0
     total_aggs = 0
 
     while True:
-        # scan_ids zum Löschen finden
+        # Erst scan_agg der ältesten Scans löschen (FK), LIMIT in der Derived Table
         cursor.execute("""
-            SELECT id FROM scan_run
-            WHERE ts < %s
-            LIMIT %s
+            DELETE sa FROM scan_agg sa
+            INNER JOIN (
+                SELECT id FROM scan_run
+                WHERE ts < %s
+                ORDER BY ts, id
+                LIMIT %s
+            ) b ON sa.scan_id = b.id
         """, (cutoff_date, DELETE_BATCH_SIZE))
-
-        scan_ids = [row[0] for row in cursor.fetchall()]
-
-        if not scan_ids:
-            break
-
-        placeholders = ','.join(['%s'] * len(scan_ids))
-
-        # Erst scan_agg löschen (FK)
-        cursor.execute(f"DELETE FROM scan_agg WHERE scan_id IN ({placeholders})", scan_ids)
         aggs_deleted = cursor.rowcount
 
-        # Dann scan_run
-        cursor.execute(f"DELETE FROM scan_run WHERE id IN ({placeholders})", scan_ids)
+        # Dann dieselben scan_run (restliche Kind-Zeilen entfernt ON DELETE CASCADE)
+        cursor.execute("""
+            DELETE FROM scan_run
+            WHERE ts < %s
+            ORDER BY ts, id
+            LIMIT %s
+        """, (cutoff_date, DELETE_BATCH_SIZE))
         scans_deleted = cursor.rowcount
-
         conn.commit()
 
         total_scans += scans_deleted
         total_aggs += aggs_deleted
 
-        logger.info(f"  Gelöscht: {scans_deleted} scan_run, {aggs_deleted} scan_agg (Gesamt: {total_scans}, {total_aggs})")
+        if scans_deleted > 0:
+            logger.info(
+                "  Gelöscht: %d scan_run, %d scan_agg (Gesamt: %d, %d)",
+                scans_deleted, aggs_deleted, total_scans, total_aggs
+            )
 
         if scans_deleted < DELETE_BATCH_SIZE:
             break
@@ -299,11 +280,8 @@ def delete_old_scans(conn, cutoff_date: datetime, dry_run: bool = True) -> Tuple
     return total_scans, total_aggs
 
 
-def delete_old_deals(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
+def delete_old_deals(conn, cutoff_date: datetime) -> int:
     """Löscht alte deal_alert Einträge."""
-    if dry_run:
-        return count_deletable_deals(conn, cutoff_date)
-
     cursor = conn.cursor()
     total_deleted = 0
 
@@ -320,7 +298,7 @@ def delete_old_deals(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
         total_deleted += deleted
 
         if deleted > 0:
-            logger.info(f"  Gelöscht: {deleted} deal_alert Einträge (Gesamt: {total_deleted})")
+            logger.info("  Gelöscht: %d deal_alert Einträge (Gesamt: %d)", deleted, total_deleted)
 
         if deleted < DELETE_BATCH_SIZE:
             break
@@ -328,11 +306,8 @@ def delete_old_deals(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
     return total_deleted
 
 
-def delete_old_legacy(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
+def delete_old_legacy(conn, cutoff_date: datetime) -> int:
     """Löscht alte preis_historie Einträge."""
-    if dry_run:
-        return count_deletable_legacy(conn, cutoff_date)
-
     cursor = conn.cursor()
     total_deleted = 0
 
@@ -349,7 +324,7 @@ def delete_old_legacy(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
         total_deleted += deleted
 
         if deleted > 0:
-            logger.info(f"  Gelöscht: {deleted} preis_historie Einträge (Gesamt: {total_deleted})")
+            logger.info("  Gelöscht: %d preis_historie Einträge (Gesamt: %d)", deleted, total_deleted)
 
         if deleted < DELETE_BATCH_SIZE:
             break
@@ -357,27 +332,71 @@ def delete_old_legacy(conn, cutoff_date: datetime, dry_run: bool = True) -> int:
     return total_deleted
 
 
-def optimize_tables(conn):
-    """Optimiert Tabellen nach dem Löschen."""
+def delete_old_legacy_separately(cutoff_date: datetime) -> int:
+    """Löscht alte preis_historie Einträge auf einer eigenen Connection (Worker-Thread)."""
+    conn = get_db_connection()
+    try:
+        return delete_old_legacy(conn, cutoff_date)
+    finally:
+        conn.close()
+
+
+def optimize_tables(conn, force: bool = False):
+    """
+    Optimiert Tabellen nach dem Löschen.
+
+    Args:
+        force: Alle Tabellen optimieren (--optimize); sonst nur solche mit
+            mindestens OPTIMIZE_MIN_FREE_PCT freiem Platz
+    """
     cursor = conn.cursor()
     tables = ['offer_snapshot', 'scan_run', 'scan_agg', 'deal_alert', 'preis_historie']
 
+    sizes = {}
+    if not force:
+        # MySQL 8 cached information_schema-Statistiken (Default 24h) - ohne
+        # frische Werte sähe die Prüfung die Größe vor den Löschungen
+        try:
+            cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        except mysql.connector.Error:
+            pass  # Ältere Server lesen die Statistiken ohnehin live
+
+        # Freier Platz je Tabelle; OPTIMIZE baut InnoDB-Tabellen komplett neu auf
+        placeholders = ','.join(['%s'] * len(tables))
+        cursor.execute(f"""
+            SELECT table_name, data_length, data_free
+            FROM information_schema.tables
+            WHERE table_schema = %s AND table_name IN ({placeholders})
+        """, (DB_NAME, *tables))
+        sizes = {row[0]: (row[1] or 0, row[2] or 0) for row in cursor.fetchall()}
+
     for table in tables:
+        if not force:
+            data_length, data_free = sizes.get(table, (0, 0))
+            if not data_length or data_free * 100 < data_length * OPTIMIZE_MIN_FREE_PCT:
+                logger.info("Überspringe %s (%.2f MB frei)", table, data_free / 1024 / 1024)
+                continue
+
         try:
-            logger.info(f"Optimiere {table}...")
+            logger.info("Optimiere %s...", table)
             cursor.execute(f"OPTIMIZE TABLE {table}")
             result = cursor.fetchall()
-            logger.info(f"  {table}: {result}")
+            logger.info("  %s: %s", table, result)
         except mysql.connector.Error as e:
-            logger.warning(f"  Optimierung von {table} fehlgeschlagen: {e}")
+            logger.warning("  Optimierung von %s fehlgeschlagen: %s", table, e)
 
 
 # ============================================
 # HAUPTLOGIK
 # ============================================
 
-def run_retention(execute: bool = False):
-    """Führt die Retention-Logik aus."""
+def run_retention(execute: bool = False, conn=None):
+    """
+    Führt die Retention-Logik aus.
+
+    Args:
+        conn: Connection des Aufrufers (optional, sonst eine eigene)
+    """
     now = datetime.now()
 
     cutoff_offers = now - timedelta(days=RETENTION_OFFERS_DAYS)
@@ -386,44 +405,64 @@ def run_retention(execute: bool = False):
     cutoff_legacy = now - timedelta(days=RETENTION_LEGACY_DAYS)
 
     mode = "AUSFÜHRUNG" if execute else "DRY-RUN (keine Änderungen)"
+    verb = "Gelöscht" if execute else "Würde löschen"
 
     logger.info("=" * 60)
-    logger.info(f"Cardmarket Scanner - Data Retention [{mode}]")
+    logger.info("Cardmarket Scanner - Data Retention [%s]", mode)
     logger.info("=" * 60)
-    logger.info(f"Zeitpunkt: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("Zeitpunkt: %s", now.replace(microsecond=0))
     logger.info("")
     logger.info("Aufbewahrungsrichtlinien:")
-    logger.info(f"  offer_snapshot:  {RETENTION_OFFERS_DAYS} Tage (vor {cutoff_offers.strftime('%Y-%m-%d')})")
-    logger.info(f"  scan_run/agg:    {RETENTION_AGGREGATES_DAYS} Tage (vor {cutoff_aggregates.strftime('%Y-%m-%d')})")
-    logger.info(f"  deal_alert:      {RETENTION_DEALS_DAYS} Tage (vor {cutoff_deals.strftime('%Y-%m-%d')})")
-    logger.info(f"  preis_historie:  {RETENTION_LEGACY_DAYS} Tage (vor {cutoff_legacy.strftime('%Y-%m-%d')})")
+    logger.info("  offer_snapshot:  %d Tage (vor %s)", RETENTION_OFFERS_DAYS, cutoff_offers.date())
+    logger.info("  scan_run/agg:    %d Tage (vor %s)", RETENTION_AGGREGATES_DAYS, cutoff_aggregates.date())
+    logger.info("  deal_alert:      %d Tage (vor %s)", RETENTION_DEALS_DAYS, cutoff_deals.date())
+    logger.info("  preis_historie:  %d Tage (vor %s)", RETENTION_LEGACY_DAYS, cutoff_legacy.date())
     logger.info("")
 
-    conn = get_db_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    executor = None
 
     try:
+        # Dry-Run: alle Zählungen in einer Abfrage
+        counts = None
+        legacy_future = None
+        if not execute:
+            counts = count_all(conn, cutoff_offers, cutoff_aggregates, cutoff_deals, cutoff_legacy)
+        else:
+            # preis_historie hat keine Fremdschlüssel zu den Scan-Tabellen und
+            # kann parallel bereinigt werden; die übrigen Phasen teilen sich
+            # scan_run (ON DELETE CASCADE) und bleiben sequenziell
+            executor = ThreadPoolExecutor(max_workers=1)
+            legacy_future = executor.submit(delete_old_legacy_separately, cutoff_legacy)
+
         # 1. offer_snapshot bereinigen
         logger.info("1. offer_snapshot bereinigen...")
-        offers_count = delete_old_offers(conn, cutoff_offers, dry_run=not execute)
-        logger.info(f"   {'Würde löschen' if not execute else 'Gelöscht'}: {offers_count:,} Einträge")
+        offers_count = counts['offers'] if not execute else delete_old_offers(conn, cutoff_offers)
+        logger.info("   %s: %s Einträge", verb, format(offers_count, ','))
 
         # 2. scan_run und scan_agg bereinigen
         logger.info("2. scan_run und scan_agg bereinigen...")
-        scans_count, aggs_count = delete_old_scans(conn, cutoff_aggregates, dry_run=not execute)
-        logger.info(f"   {'Würde löschen' if not execute else 'Gelöscht'}: {scans_count:,} scan_run, {aggs_count:,} scan_agg")
+        scans_count, aggs_count = (
+            (counts['scans'], counts['aggs']) if not execute
+            else delete_old_scans(conn, cutoff_aggregates)
+        )
+        logger.info("   %s: %s scan_run, %s scan_agg", verb, format(scans_count, ','), format(aggs_count, ','))
 
         # 3. deal_alert bereinigen
         logger.info("3. deal_alert bereinigen...")
-        deals_count = delete_old_deals(conn, cutoff_deals, dry_run=not execute)
-        logger.info(f"   {'Würde löschen' if not execute else 'Gelöscht'}: {deals_count:,} Einträge")
+        deals_count = counts['deals'] if not execute else delete_old_deals(conn, cutoff_deals)
+        logger.info("   %s: %s Einträge", verb, format(deals_count, ','))
 
         # 4. preis_historie bereinigen
         logger.info("4. preis_historie bereinigen...")
-        legacy_count = delete_old_legacy(conn, cutoff_legacy, dry_run=not execute)
-        logger.info(f"   {'Würde löschen' if not execute else 'Gelöscht'}: {legacy_count:,} Einträge")
+        legacy_count = counts['legacy'] if not execute else legacy_future.result()
+        logger.info("   %s: %s Einträge", verb, format(legacy_count, ','))
 
-        # 5. Tabellen optimieren (nur bei Ausführung)
-        if execute and (offers_count > 0 or scans_count > 0 or deals_count > 0 or legacy_count > 0):
+        # 5. Tabellen optimieren (nur bei Ausführung und RETENTION_OPTIMIZE;
+        #    InnoDB gibt gelöschte Seiten auch ohne Rebuild wieder frei)
+        if execute and RETENTION_OPTIMIZE and (offers_count > 0 or scans_count > 0 or deals_count > 0 or legacy_count > 0):
             logger.info("")
             logger.info("5. Tabellen optimieren...")
             optimize_tables(conn)
@@ -434,7 +473,15 @@ def run_retention(execute: bool = False):
         logger.info("=" * 60)
 
     finally:
-        conn.close()
+        if executor is not None:
+            executor.shutdown()
+            # Bricht eine frühere Phase ab, wird result() nie aufgerufen:
+            # einen Fehler der preis_historie-Bereinigung trotzdem melden
+            legacy_error = legacy_future.exception()
+            if legacy_error is not None and legacy_error is not sys.exc_info()[1]:
+                logger.error("preis_historie-Bereinigung fehlgeschlagen: %s", legacy_error)
+        if own_conn:
+            conn.close()
 
 
 def main():
@@ -449,6 +496,8 @@ Umgebungsvariablen:
   RETENTION_DEALS_DAYS       Aufbewahrung für deal_alert (default: 90)
   RETENTION_LEGACY_DAYS      Aufbewahrung für preis_historie (default: 365)
   DELETE_BATCH_SIZE          Batch-Größe für Löschungen (default: 10000)
+  RETENTION_OPTIMIZE         OPTIMIZE TABLE nach --execute (default: false)
+  OPTIMIZE_MIN_FREE_PCT      RETENTION_OPTIMIZE: nur Tabellen mit so viel % freiem Platz (default: 20)
 
 Beispiele:
   python retention.py              # Dry-Run
@@ -486,11 +535,11 @@ Beispiele:
 
         elif args.optimize:
             logger.info("Optimiere Tabellen...")
-            optimize_tables(conn)
+            optimize_tables(conn, force=True)
             logger.info("Fertig.")
 
         else:
-            run_retention(execute=args.execute)
+            run_retention(execute=args.execute, conn=conn)
 
             # Statistiken nach Ausführung anzeigen
             if args.execute:
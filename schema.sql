@@ -30,7 +30,7 @@ CREATE TABLE IF NOT EXISTS scan_run (
     parse_version VARCHAR(32) NOT NULL DEFAULT 'v2.0' COMMENT 'Parser-Version',
     PRIMARY KEY (id),
     INDEX idx_scan_run_ts (ts),
-    INDEX idx_scan_run_card_ts (karten_nummer, set_code, land, foil, ts),
+    INDEX idx_scan_run_card_ok_ts (karten_nummer, set_code, land, foil, ok, ts),
     INDEX idx_scan_run_watchlist_ts (watchlist_id, ts)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
 COMMENT='Scan-Protokoll pro Watchlist-Eintrag und Durchlauf';
@@ -305,9 +305,18 @@ DELIMITER ;
 -- CLEANUP / MAINTENANCE
 -- ============================================
 
+-- Bestehende Installationen: Index für die Rolling-Baseline ersetzen
+-- (ok vor ts, damit ORDER BY ts DESC LIMIT direkt den Index abläuft;
+-- idx_scan_run_card_ts wird damit überflüssig)
+--
+-- ALTER TABLE scan_run
+--     DROP INDEX idx_scan_run_card_ts,
+--     ADD INDEX idx_scan_run_card_ok_ts (karten_nummer, set_code, land, foil, ok, ts);
+
 -- Optimierung: Partitionierung für große Tabellen (optional)
 -- Bei sehr großen Datenmengen kann die offer_snapshot Tabelle
--- nach Monat partitioniert werden:
+-- nach Monat partitioniert werden. InnoDB partitioniert keine Tabellen
+-- mit Foreign Keys, fk_offer_scan muss dafür vorher entfernt werden:
 --
 -- ALTER TABLE offer_snapshot
 -- PARTITION BY RANGE (YEAR(scan_id) * 100 + MONTH(scan_id)) (
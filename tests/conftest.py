@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Fixtures für die Cardmarket Scanner Tests
+====================================================
+Session-scoped: jede Fixture-Datei wird pro Test-Prozess (bzw. pro
+pytest-xdist Worker) nur einmal gelesen und geparst.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Projektverzeichnis zum Path hinzufügen
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cron_scanner_v2 import CardmarketParser, calculate_aggregates
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+@pytest.fixture(scope="session")
+def sample_html():
+    """Lädt die Beispiel-Produktseite."""
+    with open(FIXTURES_DIR / 'sample_product_page.html', 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope="session")
+def no_offers_html():
+    """Lädt die Seite ohne Angebote."""
+    with open(FIXTURES_DIR / 'no_offers_page.html', 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope="session")
+def not_found_html():
+    """Lädt die 404-Seite."""
+    with open(FIXTURES_DIR / 'not_found_page.html', 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope="session")
+def parsed_offers(sample_html):
+    """Parst die Beispiel-Produktseite einmal (Tests verändern die Offers nicht)."""
+    return CardmarketParser(sample_html).parse()
+
+
+@pytest.fixture(scope="class")
+def parsed_and_aggregated(sample_html):
+    """Offers (max. 150) und ihre Aggregate für die Integrationstests."""
+    offers = CardmarketParser(sample_html).parse(max_offers=150)
+    return offers, calculate_aggregates(offers)
@@ -7,6 +7,9 @@ Testet die Parser-Funktionen mit gespeicherten HTML-Fixtures.
 Ausführen:
     python -m pytest tests/test_parser.py -v
     python -m pytest tests/test_parser.py -v --tb=short
+    python -m pytest tests/ -n auto    # parallel (pytest-xdist)
+
+Fixtures: siehe tests/conftest.py
 """
 
 import os
@@ -27,43 +30,20 @@ from cron_scanner_v2 import (
     parse_price,
     parse_rating,
     parse_int,
+    path_segment_after,
     normalize_condition,
     condition_meets_minimum,
     calculate_percentile,
+    calculate_percentiles,
     calculate_trimmed_mean,
     get_card_name,
     generate_cardmarket_url,
+    CARDMARKET_BASE_URL,
+    BASELINE_WINDOW_SCANS,
+    DealDetector,
 )
 
 
-# ============================================
-# FIXTURES
-# ============================================
-
-FIXTURES_DIR = Path(__file__).parent / 'fixtures'
-
-
-@pytest.fixture
-def sample_html():
-    """Lädt die Beispiel-Produktseite."""
-    with open(FIXTURES_DIR / 'sample_product_page.html', 'r', encoding='utf-8') as f:
-        return f.read()
-
-
-@pytest.fixture
-def no_offers_html():
-    """Lädt die Seite ohne Angebote."""
-    with open(FIXTURES_DIR / 'no_offers_page.html', 'r', encoding='utf-8') as f:
-        return f.read()
-
-
-@pytest.fixture
-def not_found_html():
-    """Lädt die 404-Seite."""
-    with open(FIXTURES_DIR / 'not_found_page.html', 'r', encoding='utf-8') as f:
-        return f.read()
-
-
 # ============================================
 # PARSER TESTS
 # ============================================
@@ -71,27 +51,24 @@ def not_found_html():
 class TestCardmarketParser:
     """Tests für die CardmarketParser-Klasse."""
 
-    def test_parse_offers_count(self, sample_html):
+    def test_parse_offers_count(self, parsed_offers):
         """Testet dass die richtige Anzahl Angebote gefunden wird."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         assert len(offers) == 8
 
-    def test_parse_offer_prices(self, sample_html):
+    def test_parse_offer_prices(self, parsed_offers):
         """Testet die Extraktion der Preise."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         # Erstes Angebot: 2,50€
         assert offers[0].price_item == Decimal('2.50')
         assert offers[0].shipping == Decimal('1.50')
         assert offers[0].total == Decimal('4.00')
 
-    def test_parse_offer_conditions(self, sample_html):
+    def test_parse_offer_conditions(self, parsed_offers):
         """Testet die Extraktion der Zustände."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         conditions = [o.condition for o in offers]
         assert 'NM' in conditions
@@ -100,37 +77,42 @@ class TestCardmarketParser:
         assert 'GD' in conditions
         assert 'PL' in conditions
 
-    def test_parse_seller_info(self, sample_html):
+    def test_parse_offer_languages(self, parsed_offers):
+        """Testet die Extraktion der Sprachen (ganze Wörter, kein 'en' in 'French')."""
+        offers = parsed_offers
+
+        languages = [o.language for o in offers]
+        assert languages[0] == 'German'
+        assert languages[1] == 'English'
+        assert languages[3] == 'French'
+
+    def test_parse_seller_info(self, parsed_offers):
         """Testet die Extraktion der Verkäuferinformationen."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         # Erstes Angebot
         assert offers[0].seller_name == 'TopSeller123'
         assert offers[0].seller_rating == 98.5
 
-    def test_parse_quantity(self, sample_html):
+    def test_parse_quantity(self, parsed_offers):
         """Testet die Extraktion der Mengen."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         quantities = [o.quantity for o in offers if o.quantity]
         assert 3 in quantities
         assert 5 in quantities
         assert 10 in quantities
 
-    def test_parse_foil(self, sample_html):
+    def test_parse_foil(self, parsed_offers):
         """Testet die Erkennung von Foil-Karten."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         foil_offers = [o for o in offers if o.is_foil]
         assert len(foil_offers) >= 1
 
-    def test_parse_article_id(self, sample_html):
+    def test_parse_article_id(self, parsed_offers):
         """Testet die Extraktion der Artikel-IDs."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         assert offers[0].article_id == '98765001'
         assert offers[1].article_id == '98765002'
@@ -142,14 +124,35 @@ class TestCardmarketParser:
 
         assert len(offers) == 0
 
-    def test_parse_positions(self, sample_html):
+    def test_parse_positions(self, parsed_offers):
         """Testet die korrekte Positionszuweisung."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+        offers = parsed_offers
 
         positions = [o.position for o in offers]
         assert positions == list(range(1, len(offers) + 1))
 
+    def test_extract_language_from_flag_src(self):
+        """Testet Flaggen-Icons, deren Titel keine Sprache nennt."""
+        parser = CardmarketParser(
+            '<div class="article-row">'
+            '<img src="/img/flags/de.png" title="Card language">'
+            '</div>'
+        )
+        row = parser.soup.select_one('div.article-row')
+
+        assert parser._extract_language(row) == 'German'
+
+    def test_extract_currency_from_entity(self):
+        """Testet Währungszeichen, die nur als HTML-Entity im Quelltext stehen."""
+        parser = CardmarketParser(
+            '<div class="article-row"><span>5,00 &#36;</span></div>'
+            '<div class="article-row"><span>4,00 &pound;</span></div>'
+        )
+        rows = parser.soup.select('div.article-row')
+
+        assert parser._extract_currency(rows[0]) == 'USD'
+        assert parser._extract_currency(rows[1]) == 'GBP'
+
     def test_extract_product_id(self, sample_html):
         """Testet die Extraktion der Produkt-ID."""
         parser = CardmarketParser(sample_html)
@@ -209,6 +212,18 @@ class TestParseInt:
         assert parse_int('abc') is None
 
 
+class TestPathSegmentAfter:
+    """Tests für die path_segment_after Funktion."""
+
+    def test_segment_found(self):
+        assert path_segment_after('/de/Riftbound/Users/TopSeller123', '/Users/') == 'TopSeller123'
+        assert path_segment_after('/de/Riftbound/Users/Seller/Offers', '/Users/') == 'Seller'
+
+    def test_segment_missing(self):
+        assert path_segment_after('/de/Riftbound/Article/1', '/Users/') is None
+        assert path_segment_after('/de/Riftbound/Users/', '/Users/') is None
+
+
 class TestNormalizeCondition:
     """Tests für die normalize_condition Funktion."""
 
@@ -234,6 +249,11 @@ class TestNormalizeCondition:
         assert normalize_condition('near mint') == 'NM'
         assert normalize_condition('MINT') == 'MT'
 
+    def test_normalize_whole_words_only(self):
+        assert normalize_condition('Lightly Played') == 'LP'
+        assert normalize_condition('Mint condition') == 'MT'
+        assert normalize_condition('Unknown') == 'Unknown'
+
     def test_normalize_empty(self):
         assert normalize_condition('') is None
         assert normalize_condition(None) is None
@@ -277,6 +297,13 @@ class TestCalculatePercentile:
     def test_percentile_empty(self):
         assert calculate_percentile([], 50) is None
 
+    def test_percentiles_batch_matches_single(self):
+        values = [1.0, 2.5, 3.0, 7.25, 9.0]
+        qs = (10, 25, 50, 75, 90)
+
+        assert calculate_percentiles(values, qs) == [calculate_percentile(values, q) for q in qs]
+        assert calculate_percentiles([], qs) == [None] * len(qs)
+
 
 class TestCalculateTrimmedMean:
     """Tests für die calculate_trimmed_mean Funktion."""
@@ -296,9 +323,8 @@ class TestCalculateTrimmedMean:
 class TestCalculateAggregates:
     """Tests für die calculate_aggregates Funktion."""
 
-    def test_aggregates_basic(self, sample_html):
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+    def test_aggregates_basic(self, parsed_offers):
+        offers = parsed_offers
         stats = calculate_aggregates(offers)
 
         assert stats.offer_count == 8
@@ -316,9 +342,8 @@ class TestCalculateAggregates:
         assert stats.min_total is None
         assert stats.median_total is None
 
-    def test_aggregates_iqr(self, sample_html):
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
+    def test_aggregates_iqr(self, parsed_offers):
+        offers = parsed_offers
         stats = calculate_aggregates(offers)
 
         if stats.p25_total and stats.p75_total:
@@ -375,6 +400,95 @@ class TestCardNameLookup:
         assert get_card_name('999', 'OGN') is None
         assert get_card_name('1', 'INVALID') is None
 
+    def test_lookup_zeros_and_empty(self):
+        assert get_card_name('000', 'OGS') == 'Buff'
+        assert get_card_name('', 'OGS') is None
+
+
+# ============================================
+# DEAL DETECTOR BASELINE TESTS
+# ============================================
+
+KEY = ('1', 'OGN', 'Germany', False)
+
+
+class StubDB:
+    """Minimaler DB-Ersatz: liefert Baseline-Fenster (neuester zuerst) aus einem Dict."""
+
+    def __init__(self, windows):
+        self.windows = windows
+        self.window_calls = []
+
+    def get_baseline_windows(self, keys, window_scans):
+        return {k: self.windows[k][:window_scans] for k in keys if k in self.windows}
+
+    def get_baseline_window(self, karten_nummer, set_code, land, foil, window_scans,
+                            conn=None, exclude_scan_id=None):
+        self.window_calls.append(exclude_scan_id)
+        return self.windows.get((karten_nummer, set_code, land, foil), [])[:window_scans]
+
+
+class TestDealDetectorBaseline:
+    """Tests für das Rolling-Baseline-Fenster des DealDetector."""
+
+    def test_warm_path(self):
+        db = StubDB({KEY: [3.0, 2.0, 1.0]})
+        detector = DealDetector(db)
+        detector.warm([KEY])
+
+        assert detector._get_baseline(KEY, 7, Decimal('10.00')) == Decimal('2.50')
+        # Gewärmtes Fenster: keine Einzelabfrage
+        assert db.window_calls == []
+
+    def test_lazy_path(self):
+        db = StubDB({KEY: [4.0, 2.0]})
+        detector = DealDetector(db)
+
+        assert detector._get_baseline(KEY, 7, Decimal('3.00')) == Decimal('3.00')
+        assert db.window_calls == [7]
+        # Zweiter Zugriff nutzt das Fenster im Speicher
+        detector._get_baseline(KEY, 8, None)
+        assert db.window_calls == [7]
+
+    def test_no_history(self):
+        detector = DealDetector(StubDB({}))
+
+        assert detector._get_baseline(KEY, 1, None) is None
+        assert detector._get_baseline(KEY, 1, Decimal('2.00')) == Decimal('2.00')
+
+    def test_median_not_appended_before_push(self):
+        detector = DealDetector(StubDB({KEY: [1.0]}))
+        detector.warm([KEY])
+
+        detector._get_baseline(KEY, 1, Decimal('9.00'))
+        # Ohne push_median (z.B. Rollback) bleibt das Fenster unverändert
+        assert list(detector._windows[KEY]) == [1.0]
+
+        detector.push_median(KEY, Decimal('9.00'))
+        assert list(detector._windows[KEY]) == [1.0, 9.0]
+
+    def test_push_respects_maxlen(self):
+        history = [float(i) for i in range(BASELINE_WINDOW_SCANS, 0, -1)]
+        detector = DealDetector(StubDB({KEY: history}))
+        detector.warm([KEY])
+
+        detector.push_median(KEY, Decimal('100.00'))
+        window = detector._windows[KEY]
+        assert len(window) == BASELINE_WINDOW_SCANS
+        assert window[0] == 2.0
+        assert window[-1] == 100.0
+
+    def test_push_without_window_or_median(self):
+        detector = DealDetector(StubDB({KEY: [1.0]}))
+
+        # Kein Fenster geladen: nichts anlegen, der nächste Zugriff liest die DB
+        detector.push_median(KEY, Decimal('5.00'))
+        assert KEY not in detector._windows
+
+        detector.warm([KEY])
+        detector.push_median(KEY, None)
+        assert list(detector._windows[KEY]) == [1.0]
+
 
 # ============================================
 # OFFER DATACLASS TESTS
@@ -406,11 +520,9 @@ class TestOfferDataclass:
 class TestIntegration:
     """Integrationstests für den gesamten Parser-Flow."""
 
-    def test_full_parsing_flow(self, sample_html):
+    def test_full_parsing_flow(self, parsed_and_aggregated):
         """Testet den kompletten Parsing-Ablauf."""
-        # Parsen
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse(max_offers=150)
+        offers, stats = parsed_and_aggregated
 
         # Validierung der Offers
         assert len(offers) > 0
@@ -422,8 +534,6 @@ class TestIntegration:
             assert offer.currency == 'EUR'
 
         # Aggregation
-        stats = calculate_aggregates(offers)
-
         assert stats.offer_count == len(offers)
         assert stats.min_total <= stats.max_total
 
@@ -435,11 +545,9 @@ class TestIntegration:
             assert stats.median_total <= stats.p75_total
             assert stats.p75_total <= stats.p90_total
 
-    def test_deal_detection_scenario(self, sample_html):
+    def test_deal_detection_scenario(self, parsed_and_aggregated):
         """Testet ein Deal-Detection-Szenario."""
-        parser = CardmarketParser(sample_html)
-        offers = parser.parse()
-        stats = calculate_aggregates(offers)
+        offers, stats = parsed_and_aggregated
 
         # Simulierte Baseline (Median der letzten Scans)
         baseline = stats.median_total